@@ -0,0 +1,55 @@
+#/services/ai-agent-service/src/agent_catalog.py
+from types import MappingProxyType
+
+# Agents exposed to clients; static, so it is built once at import. Read-only
+# throughout, since one instance backs every /agents response and its ETag.
+AVAILABLE_AGENTS = tuple(MappingProxyType(agent) for agent in (
+    {
+        'id': 'evidence',
+        'name': 'Evidence Analyst',
+        'description': 'Analyzes and searches through case evidence and documents',
+        'icon': '🔍',
+        'capabilities': (
+            'Document analysis',
+            'Evidence search',
+            'Fact extraction',
+            'Timeline reconstruction'
+        )
+    },
+    {
+        'id': 'summary',
+        'name': 'Case Summarizer',
+        'description': 'Provides comprehensive case summaries and overviews',
+        'icon': '📋',
+        'capabilities': (
+            'Case summarization',
+            'Key points extraction',
+            'Status updates',
+            'Progress tracking'
+        )
+    },
+    {
+        'id': 'draft',
+        'name': 'Document Drafter',
+        'description': 'Helps draft legal documents and correspondence',
+        'icon': '📝',
+        'capabilities': (
+            'Legal document drafting',
+            'Letter writing',
+            'Contract reviews',
+            'Motion preparation'
+        )
+    },
+    {
+        'id': 'general',
+        'name': 'Legal Assistant',
+        'description': 'General legal assistance and case guidance',
+        'icon': '⚖️',
+        'capabilities': (
+            'Legal advice',
+            'Case strategy',
+            'Research assistance',
+            'General guidance'
+        )
+    }
+))
@@ -2,8 +2,7 @@
 import logging
 import time
 from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import os
+from .gemini import get_model
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +13,8 @@ class DraftAgent:
         self.firestore_client = firestore_client
         self.document_tool = document_tool
         
-        # Initialize Gemini
-        try:
-            api_key = os.environ.get('GOOGLE_AI_API_KEY')
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-pro')
-            else:
-                self.model = None
-                logger.warning("⚠️ Gemini API key not found, using fallback responses")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini: {e}")
-            self.model = None
+        # Shared Gemini model (None when the API key is missing)
+        self.model = get_model()
         
         # Document templates
         self.templates = {
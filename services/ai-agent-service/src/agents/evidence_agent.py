@@ -2,43 +2,52 @@
 import logging
 import time
 from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import os
+from .gemini import get_model
 
 logger = logging.getLogger(__name__)
 
 class EvidenceAgent:
     """AI agent specialized in evidence analysis and document search"""
     
+    CONN_CHECK_TTL = 60  # seconds
+    CONN_FAILURE_TTL = 15  # seconds; shorter, so recovery is noticed quickly
+    
     def __init__(self, firestore_client, search_tool, document_tool):
         self.firestore_client = firestore_client
         self.search_tool = search_tool
         self.document_tool = document_tool
         
-        # Initialize Gemini
-        try:
-            api_key = os.environ.get('GOOGLE_AI_API_KEY')
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-pro')
-            else:
-                self.model = None
-                logger.warning("⚠️ Gemini API key not found, using fallback responses")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini: {e}")
-            self.model = None
+        # Shared Gemini model (None when the API key is missing)
+        self.model = get_model()
+        
+        # (checked_at, ok, error) for the last connection probe
+        self._last_conn_check = (0.0, False, None)
         
         logger.info("✅ EvidenceAgent initialized")
 
     def test_connection(self):
-        """Test agent connection"""
+        """Test agent connection (result cached for CONN_CHECK_TTL seconds, failures for CONN_FAILURE_TTL)"""
+        checked_at, ok, error = self._last_conn_check
+        age = time.time() - checked_at
+        if error is not None:
+            # During an outage every health check would otherwise hit Gemini again
+            if age < self.CONN_FAILURE_TTL:
+                raise error
+        elif age < self.CONN_CHECK_TTL:
+            return ok
+        
         try:
             if self.model:
-                response = self.model.generate_content("Test evidence agent")
-                return bool(response.text)
-            return True
+                # Metadata-only call; avoids spending generation quota on a probe
+                import google.generativeai as genai
+                ok = any(True for _ in genai.list_models())
+            else:
+                ok = True
+            self._last_conn_check = (time.time(), ok, None)
+            return ok
         except Exception as e:
             logger.error(f"Evidence agent test failed: {e}")
+            self._last_conn_check = (time.time(), False, e)
             raise
 
     def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[str]:
@@ -127,7 +136,7 @@ class EvidenceAgent:
         """Analyze evidence in the case"""
         try:
             # Get case documents and analysis
-            documents = self.document_tool.get_case_documents_summary(case_id)
+            documents, doc_count = self.document_tool.get_case_documents_summary_with_count(case_id)
             
             if not documents:
                 return "I don't see any documents in this case to analyze. Please upload some documents first, and I'll be happy to help analyze the evidence."
@@ -150,9 +159,9 @@ class EvidenceAgent:
             
             if self.model:
                 response = self.model.generate_content(prompt)
-                return response.text if response.text else self._fallback_evidence_analysis(documents)
+                return response.text if response.text else self._fallback_evidence_analysis(doc_count)
             else:
-                return self._fallback_evidence_analysis(documents)
+                return self._fallback_evidence_analysis(doc_count)
                 
         except Exception as e:
             logger.error(f"Evidence analysis error: {e}")
@@ -329,11 +338,11 @@ class EvidenceAgent:
         
         return search_terms[:5]  # Limit to 5 terms
 
-    def _fallback_evidence_analysis(self, documents: str) -> str:
+    def _fallback_evidence_analysis(self, doc_count: int) -> str:
         """Fallback evidence analysis when AI is unavailable"""
         return f"""Based on the available documents in this case, here's a basic evidence analysis:
 
-📄 **Document Summary**: I found {documents.count('Document')} documents in this case.
+📄 **Document Summary**: I found {doc_count} documents in this case.
 
 🔍 **Analysis Approach**:
 1. Review each document for factual content
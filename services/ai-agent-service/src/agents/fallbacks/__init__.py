@@ -0,0 +1,66 @@
+#services/ai-agent-service/src/agents/fallbacks/__init__.py
+"""
+Static fallback responses used when Gemini is unavailable.
+
+Each kind is a Markdown template (<kind>.md) with $message, $case_type,
+$status and $priority placeholders; any other '$' text is literal.
+"""
+import functools
+import re
+import sys
+import threading
+from importlib import resources
+from typing import Dict, Optional, Tuple
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+
+# Fallback kinds and the case type each shows when unset
+CASE_TYPE_DEFAULTS = {
+    'legal': 'Legal',
+    'strategy': 'General',
+    'procedure': 'Legal',
+    'research': 'Legal',
+    'risk': 'Legal',
+    'settlement': 'Legal',
+    'timeline': 'Legal',
+    'general': 'Legal',
+}
+
+_FIELD_RE = re.compile(r'\$(message|case_type|status|priority)\b')
+
+# Rendered fallbacks; during a Gemini outage repeated questions become dict lookups
+_cache = TTLCache(maxsize=2048, ttl=300)
+_cache_lock = threading.Lock()
+
+@functools.cache
+def _load(kind: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Read a template on first use, pre-split into (literals, fields)"""
+    text = (resources.files(__package__) / f'{kind}.md').read_text(encoding='utf-8').rstrip('\n')
+    parts = _FIELD_RE.split(text)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+def render(kind: str, message: str, case_data: Optional[Dict] = None) -> str:
+    """Render the fallback response of the given kind"""
+    case_data = case_data or {}
+    # Case fields are low-cardinality; interning them lets cache key comparisons short-circuit on identity
+    values = {
+        'message': message,
+        'case_type': sys.intern(str(case_data.get('type', CASE_TYPE_DEFAULTS[kind]))),
+        'status': sys.intern(str(case_data.get('status', 'Active'))),
+        'priority': sys.intern(str(case_data.get('priority', 'Medium'))),
+    }
+    key = hashkey(kind, *values.values())
+    with _cache_lock:
+        text = _cache.get(key)
+    if text is not None:
+        return text
+
+    literals, fields = _load(kind)
+    out = [literals[0]]
+    for field, literal in zip(fields, literals[1:]):
+        out.append(values[field])
+        out.append(literal)
+    text = ''.join(out)
+    with _cache_lock:
+        _cache[key] = text
+    return text
@@ -0,0 +1,41 @@
+#services/ai-agent-service/src/agents/gemini.py
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-2.5-pro'
+
+# model name -> model (None when no API key is set)
+_models: Dict[str, Optional["genai.GenerativeModel"]] = {}
+_model_lock = threading.Lock()
+
+def get_model(name: str = MODEL_NAME) -> Optional["genai.GenerativeModel"]:
+    """Return the process-wide Gemini model for name, configuring the SDK on first use.
+
+    Returns None when no API key is set; a failed initialization is retried on
+    the next call. The SDK (and its gRPC/protobuf stack) is only imported once
+    a key is present, so keyless deployments never pay for it.
+    """
+    if name in _models:
+        return _models[name]
+    with _model_lock:
+        if name in _models:
+            return _models[name]
+        try:
+            api_key = os.environ.get('GOOGLE_AI_API_KEY')
+            if api_key:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _models[name] = genai.GenerativeModel(name)
+            else:
+                logger.warning("⚠️ Gemini API key not found, using fallback responses")
+                _models[name] = None
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize Gemini: {e}")
+        return _models.get(name)
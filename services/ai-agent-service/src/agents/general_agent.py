@@ -1,132 +1,76 @@
 #services/ai-agent-service/src/agents/general_agent.py
+import hashlib
+import itertools
+import json
 import logging
+import re
+import threading
 import time
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Union
+from cachetools import TTLCache
+from google.cloud import firestore
+from .gemini import get_model
 
 logger = logging.getLogger(__name__)
 
-class GeneralAgent:
-    """AI agent for general legal assistance and guidance"""
-    
-    def __init__(self, firestore_client, search_tool, document_tool):
-        self.firestore_client = firestore_client
-        self.search_tool = search_tool
-        self.document_tool = document_tool
-        
-        # Initialize Gemini
-        try:
-            api_key = os.environ.get('GOOGLE_AI_API_KEY')
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-pro')
-            else:
-                self.model = None
-                logger.warning("⚠️ Gemini API key not found, using fallback responses")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini: {e}")
-            self.model = None
-        
-        logger.info("✅ GeneralAgent initialized")
-
-    def test_connection(self):
-        """Test agent connection"""
-        try:
-            if self.model:
-                response = self.model.generate_content("Test general legal agent")
-                return bool(response.text)
-            return True
-        except Exception as e:
-            logger.error(f"General agent test failed: {e}")
-            raise
-
-    def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[str]:
-        """Process message for general legal assistance"""
-        try:
-            logger.info(f"⚖️ GeneralAgent processing message for case {case_id}")
-            
-            # Analyze the message to determine type of assistance needed
-            assistance_type = self._analyze_assistance_type(message)
-            
-            if assistance_type == 'legal_advice':
-                return self._provide_legal_guidance(case_id, message, conversation_history)
-            elif assistance_type == 'case_strategy':
-                return self._provide_case_strategy(case_id, message)
-            elif assistance_type == 'procedure_guidance':
-                return self._provide_procedure_guidance(message)
-            elif assistance_type == 'research_help':
-                return self._provide_research_assistance(case_id, message)
-            elif assistance_type == 'risk_assessment':
-                return self._provide_risk_assessment(case_id, message)
-            elif assistance_type == 'settlement_analysis':
-                return self._provide_settlement_analysis(case_id, message)
-            elif assistance_type == 'timeline_guidance':
-                return self._provide_timeline_guidance(case_id, message)
-            else:
-                return self._general_legal_assistance(case_id, message, conversation_history)
-                
-        except Exception as e:
-            logger.error(f"❌ GeneralAgent error: {e}")
-            return "I encountered an error while processing your request. Please try rephrasing your question or contact support if the issue persists."
-
-    def _analyze_assistance_type(self, message: str) -> str:
-        """Analyze message to determine type of assistance needed"""
-        message_lower = message.lower()
-        
-        # Legal advice keywords
-        if any(word in message_lower for word in ['advice', 'recommend', 'should i', 'what do you think', 'opinion']):
-            return 'legal_advice'
-        
-        # Strategy keywords
-        if any(word in message_lower for word in ['strategy', 'approach', 'plan', 'tactics', 'how to handle']):
-            return 'case_strategy'
-        
-        # Procedure keywords
-        if any(word in message_lower for word in ['procedure', 'process', 'steps', 'how to', 'court rules']):
-            return 'procedure_guidance'
-        
-        # Research keywords
-        if any(word in message_lower for word in ['research', 'law', 'statute', 'case law', 'precedent']):
-            return 'research_help'
-        
-        # Risk keywords
-        if any(word in message_lower for word in ['risk', 'danger', 'problem', 'issue', 'concern']):
-            return 'risk_assessment'
-        
-        # Settlement keywords
-        if any(word in message_lower for word in ['settlement', 'negotiate', 'resolve', 'compromise']):
-            return 'settlement_analysis'
-        
-        # Timeline keywords
-        if any(word in message_lower for word in ['timeline', 'deadline', 'when', 'schedule', 'timing']):
-            return 'timeline_guidance'
-        
-        return 'general_assistance'
-
-    def _provide_legal_guidance(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> str:
-        """Provide general legal guidance"""
-        try:
-            case_data = self._get_case_data(case_id)
-            case_context = self.document_tool.get_case_context(case_id)
-            
-            # Build conversation context
-            context = ""
-            if conversation_history:
-                context = "Previous conversation context:\n"
-                for msg in conversation_history[-3:]:
-                    role = "User" if msg.get('type') == 'user' else "Assistant"
-                    context += f"{role}: {msg.get('message', '')}\n"
-            
-            prompt = f"""
+# Handlers return either a complete response or an iterator of streamed chunks
+AgentResponse = Union[str, Iterator[str]]
+
+# Assistance categories in priority order: the first category with a keyword
+# anywhere in the message wins.
+_ASSISTANCE_KEYWORDS = (
+    ('legal_advice', frozenset({'advice', 'recommend', 'should i', 'what do you think', 'opinion'})),
+    ('case_strategy', frozenset({'strategy', 'approach', 'plan', 'tactics', 'how to handle'})),
+    ('procedure_guidance', frozenset({'procedure', 'process', 'steps', 'how to', 'court rules'})),
+    ('research_help', frozenset({'research', 'law', 'statute', 'case law', 'precedent'})),
+    ('risk_assessment', frozenset({'risk', 'danger', 'problem', 'issue', 'concern'})),
+    ('settlement_analysis', frozenset({'settlement', 'negotiate', 'resolve', 'compromise'})),
+    ('timeline_guidance', frozenset({'timeline', 'deadline', 'when', 'schedule', 'timing'})),
+)
+
+# keyword -> (priority, category)
+_KEYWORD_CATEGORY = {}
+for _priority, (_category, _keywords) in enumerate(_ASSISTANCE_KEYWORDS):
+    for _keyword in _keywords:
+        _KEYWORD_CATEGORY.setdefault(_keyword, (_priority, _category))
+
+# One scan over the message finds every keyword occurrence. The lookahead is
+# zero-width so overlapping keywords are all reported, and alternatives are
+# ordered by priority so the best keyword starting at each offset is the one
+# that matches.
+_ASSISTANCE_RE = re.compile('(?=({}))'.format('|'.join(
+    re.escape(keyword) for keyword in sorted(
+        _KEYWORD_CATEGORY, key=lambda k: (_KEYWORD_CATEGORY[k][0], -len(k))
+    )
+)))
+
+# Insights response parsing: any of these words in a line starts a section. A
+# line naming several sections goes to the earliest one in this table.
+_INSIGHT_SECTIONS = {
+    'topics': (0, 'keyTopics'),
+    'activity': (1, 'recentActivity'),
+    'actions': (2, 'suggestedActions'),
+    'risk factors': (3, 'riskFactors'),
+    'risks': (3, 'riskFactors'),
+    'opportunities': (4, 'opportunities'),
+}
+_INSIGHT_SECTION_RE = re.compile('|'.join(map(re.escape, _INSIGHT_SECTIONS)))
+_INSIGHT_BULLET_RE = re.compile(r'(?:\d+\.|[-•])\s*(.*)')
+_INSIGHT_BULLET_FIRST = frozenset('-•0123456789')  # cheap prefilter before the bullet regex
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+_INSIGHT_LIST_SECTIONS = frozenset({'keyTopics', 'suggestedActions', 'riskFactors', 'opportunities'})
+
+# Prompt templates, formatted per call with the case-specific fields
+_LEGAL_GUIDANCE_PROMPT = """
             As a senior legal advisor, please provide guidance on this legal question:
 
             User question: "{message}"
 
             Case information:
-            - Case: {case_data.get('title', 'Legal Matter')}
-            - Type: {case_data.get('type', 'General')}
-            - Status: {case_data.get('status', 'Active')}
+            - Case: {title}
+            - Type: {case_type}
+            - Status: {status}
 
             Case context:
             {case_context}
@@ -145,34 +89,17 @@ class GeneralAgent:
 
             Keep the response professional, practical, and actionable.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"⚖️ **Legal Guidance**\n\n{response.text}\n\n📋 **Disclaimer:** This guidance is for informational purposes only and does not constitute formal legal advice. Please consult with qualified legal counsel for specific legal decisions."
-            
-            return self._fallback_legal_guidance(message, case_data)
-            
-        except Exception as e:
-            logger.error(f"Legal guidance error: {e}")
-            return "I encountered an error while providing legal guidance. Please try rephrasing your question or provide more specific details."
 
-    def _provide_case_strategy(self, case_id: str, message: str) -> str:
-        """Provide case strategy advice"""
-        try:
-            case_data = self._get_case_data(case_id)
-            case_analysis = self._get_recent_case_analysis(case_id)
-            
-            prompt = f"""
+_CASE_STRATEGY_PROMPT = """
             As a legal strategist, please provide strategic advice for this case:
 
             User request: "{message}"
 
             Case information:
-            - Title: {case_data.get('title', 'Legal Matter')}
-            - Type: {case_data.get('type', 'General')} 
-            - Priority: {case_data.get('priority', 'Medium')}
-            - Status: {case_data.get('status', 'Active')}
+            - Title: {title}
+            - Type: {case_type} 
+            - Priority: {priority}
+            - Status: {status}
 
             Recent analysis:
             {case_analysis}
@@ -188,22 +115,8 @@ class GeneralAgent:
 
             Focus on practical, actionable strategic advice for legal professionals.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"🎯 **Case Strategy Advice**\n\n{response.text}"
-            
-            return self._fallback_strategy_guidance(message, case_data)
-            
-        except Exception as e:
-            logger.error(f"Case strategy error: {e}")
-            return "I encountered an error while providing strategy advice. Please provide more details about the strategic challenge you're facing."
 
-    def _provide_procedure_guidance(self, message: str) -> str:
-        """Provide legal procedure guidance"""
-        try:
-            prompt = f"""
+_PROCEDURE_GUIDANCE_PROMPT = """
             As a legal procedure expert, please provide guidance on this procedural question:
 
             User question: "{message}"
@@ -220,29 +133,13 @@ class GeneralAgent:
             Focus on practical guidance that legal professionals can implement.
             Include reminders about local rule variations and the importance of checking current requirements.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📋 **Procedure Guidance**\n\n{response.text}\n\n⚠️ **Important:** Procedural rules can vary by jurisdiction and change over time. Always verify current local rules and requirements."
-            
-            return self._fallback_procedure_guidance(message)
-            
-        except Exception as e:
-            logger.error(f"Procedure guidance error: {e}")
-            return "I encountered an error while providing procedure guidance. Please be more specific about the legal procedure you need help with."
 
-    def _provide_research_assistance(self, case_id: str, message: str) -> str:
-        """Provide legal research assistance"""
-        try:
-            case_data = self._get_case_data(case_id)
-            
-            prompt = f"""
+_RESEARCH_ASSISTANCE_PROMPT = """
             As a legal research specialist, please help with this research request:
 
             User request: "{message}"
 
-            Case context: {case_data.get('title', 'Legal Matter')} ({case_data.get('type', 'General')})
+            Case context: {title} ({case_type})
 
             Please provide:
             1. **Research Strategy**: How to approach this research
@@ -256,31 +153,14 @@ class GeneralAgent:
             Focus on efficient research methods and reliable sources.
             Include both traditional and modern research approaches.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"🔍 **Legal Research Assistance**\n\n{response.text}"
-            
-            return self._fallback_research_guidance(message)
-            
-        except Exception as e:
-            logger.error(f"Research assistance error: {e}")
-            return "I encountered an error while providing research assistance. Please specify what legal topic or issue you need help researching."
 
-    def _provide_risk_assessment(self, case_id: str, message: str) -> str:
-        """Provide risk assessment"""
-        try:
-            case_data = self._get_case_data(case_id)
-            case_analysis = self._get_recent_case_analysis(case_id)
-            
-            prompt = f"""
+_RISK_ASSESSMENT_PROMPT = """
             As a legal risk analyst, please assess the risks related to this question:
 
             User concern: "{message}"
 
-            Case: {case_data.get('title', 'Legal Matter')}
-            Type: {case_data.get('type', 'General')}
+            Case: {title}
+            Type: {case_type}
 
             Available analysis:
             {case_analysis}
@@ -296,31 +176,14 @@ class GeneralAgent:
 
             Focus on practical risk management for legal professionals.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"⚠️ **Risk Assessment**\n\n{response.text}"
-            
-            return self._fallback_risk_assessment(message, case_data)
-            
-        except Exception as e:
-            logger.error(f"Risk assessment error: {e}")
-            return "I encountered an error while assessing risks. Please provide more specific details about the risks or concerns you'd like me to analyze."
 
-    def _provide_settlement_analysis(self, case_id: str, message: str) -> str:
-        """Provide settlement analysis"""
-        try:
-            case_data = self._get_case_data(case_id)
-            case_context = self.document_tool.get_case_context(case_id)
-            
-            prompt = f"""
+_SETTLEMENT_ANALYSIS_PROMPT = """
             As a settlement negotiation expert, please provide analysis on this settlement question:
 
             User question: "{message}"
 
-            Case: {case_data.get('title', 'Legal Matter')}
-            Type: {case_data.get('type', 'General')}
+            Case: {title}
+            Type: {case_type}
 
             Case context:
             {case_context}
@@ -336,31 +199,15 @@ class GeneralAgent:
 
             Focus on practical settlement strategy and negotiation tactics.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"🤝 **Settlement Analysis**\n\n{response.text}"
-            
-            return self._fallback_settlement_analysis(message, case_data)
-            
-        except Exception as e:
-            logger.error(f"Settlement analysis error: {e}")
-            return "I encountered an error while analyzing settlement options. Please provide more details about the settlement situation you're considering."
 
-    def _provide_timeline_guidance(self, case_id: str, message: str) -> str:
-        """Provide timeline and deadline guidance"""
-        try:
-            case_data = self._get_case_data(case_id)
-            
-            prompt = f"""
+_TIMELINE_GUIDANCE_PROMPT = """
             As a legal project manager, please provide timeline guidance for this question:
 
             User question: "{message}"
 
-            Case: {case_data.get('title', 'Legal Matter')}
-            Type: {case_data.get('type', 'General')}
-            Created: {case_data.get('createdAt', 'Unknown')}
+            Case: {title}
+            Type: {case_type}
+            Created: {created_at}
 
             Please provide:
             1. **Timeline Framework**: Recommended timeline structure
@@ -374,24 +221,8 @@ class GeneralAgent:
             Focus on practical project management for legal matters.
             Include consideration of court schedules and opposing party timelines.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📅 **Timeline Guidance**\n\n{response.text}"
-            
-            return self._fallback_timeline_guidance(message, case_data)
-            
-        except Exception as e:
-            logger.error(f"Timeline guidance error: {e}")
-            return "I encountered an error while providing timeline guidance. Please specify what timeline or deadline questions you have."
 
-    def _general_legal_assistance(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> str:
-        """Provide general legal assistance"""
-        try:
-            case_context = self.document_tool.get_case_context(case_id)
-            
-            prompt = f"""
+_GENERAL_ASSISTANCE_PROMPT = """
             As a general legal assistant, please help with this question:
 
             User question: "{message}"
@@ -409,48 +240,367 @@ class GeneralAgent:
             Keep the response professional, practical, and actionable for legal professionals.
             If the question is outside typical legal scope, explain why and suggest alternatives.
             """
-            
+
+_CASE_INSIGHTS_PROMPT = """
+            As a senior legal advisor, please analyze this legal case and provide insights:
+
+            Case: {title}
+            Type: {case_type}
+            Status: {status}
+            Priority: {priority}
+
+            Context:
+            {case_context}
+
+            Please provide key topics and themes (5-7 topics), a brief recent activity summary,
+            suggested actions (3-5), risk factors (3-5) and opportunities (3-5).
+
+            Respond with only a JSON object using these keys:
+            "keyTopics" (array of strings), "recentActivity" (string),
+            "suggestedActions" (array of strings), "riskFactors" (array of strings),
+            "opportunities" (array of strings).
+            """
+
+class GeneralAgent:
+    """AI agent for general legal assistance and guidance"""
+    
+    __slots__ = (
+        'firestore_client', 'search_tool', 'document_tool', 'model',
+        '_analysis_collection', '_resp_cache', '_resp_lock',
+        '_case_cache', '_analysis_cache', '_insights_cache', '_case_lock', '_io_pool',
+    )
+    
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 600  # seconds
+    CASE_CACHE_SIZE = 4096
+    CASE_CACHE_TTL = 30  # seconds
+    ANALYSIS_CACHE_TTL = 60  # seconds
+    INSIGHTS_CACHE_TTL = 300  # seconds
+    CONTEXT_MAX_CHARS = 8000  # case context budget per prompt
+    
+    def __init__(self, firestore_client, search_tool, document_tool):
+        self.firestore_client = firestore_client
+        self.search_tool = search_tool
+        self.document_tool = document_tool
+        
+        # Reused for every recent-analysis lookup; only the caseId filter varies
+        self._analysis_collection = firestore_client.collection('case_analysis') if firestore_client else None
+        
+        # Shared Gemini model (None when the API key is missing)
+        self.model = get_model()
+        
+        # Gemini responses keyed by prompt hash, so repeated prompts skip the round trip
+        self._resp_cache = TTLCache(maxsize=self.RESPONSE_CACHE_SIZE, ttl=self.RESPONSE_CACHE_TTL)
+        self._resp_lock = threading.Lock()
+        
+        # Short-lived Firestore read caches, so follow-up messages on a case skip the reads.
+        # Cases are edited by other services, so the TTL is the only bound on staleness.
+        self._case_cache = TTLCache(maxsize=self.CASE_CACHE_SIZE, ttl=self.CASE_CACHE_TTL)
+        self._analysis_cache = TTLCache(maxsize=self.CASE_CACHE_SIZE, ttl=self.ANALYSIS_CACHE_TTL)
+        # Keyed by case id plus the case fields in the prompt, so edits to those fields miss the cache
+        self._insights_cache = TTLCache(maxsize=self.CASE_CACHE_SIZE, ttl=self.INSIGHTS_CACHE_TTL)
+        self._case_lock = threading.Lock()
+        
+        # Pool for overlapping independent Firestore reads
+        self._io_pool = ThreadPoolExecutor(max_workers=8)
+        
+        logger.info("✅ GeneralAgent initialized")
+
+    def test_connection(self):
+        """Test agent connection"""
+        try:
             if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return response.text
+                response = self.model.generate_content("Test general legal agent")
+                return bool(response.text)
+            return True
+        except Exception as e:
+            logger.error(f"General agent test failed: {e}")
+            raise
+
+    def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[str]:
+        """Process message for general legal assistance"""
+        try:
+            logger.info(f"⚖️ GeneralAgent processing message for case {case_id}")
             
-            return self._fallback_general_assistance(message)
+            response = self._respond(case_id, message, conversation_history)
+            return response if isinstance(response, str) else ''.join(response)
+                
+        except Exception as e:
+            logger.error(f"❌ GeneralAgent error: {e}")
+            return "I encountered an error while processing your request. Please try rephrasing your question or contact support if the issue persists."
+
+    def stream_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Iterator[str]:
+        """Process message for general legal assistance, yielding the response as Gemini generates it
+
+        Errors after the first chunk propagate, so callers can discard the partial reply.
+        """
+        try:
+            logger.info(f"⚖️ GeneralAgent streaming message for case {case_id}")
             
+            response = self._respond(case_id, message, conversation_history)
+                
         except Exception as e:
-            logger.error(f"General legal assistance error: {e}")
-            return "I'm here to help with your legal questions. Could you please provide more details or rephrase your question so I can better assist you?"
+            logger.error(f"❌ GeneralAgent error: {e}")
+            yield "I encountered an error while processing your request. Please try rephrasing your question or contact support if the issue persists."
+            return
+        
+        if isinstance(response, str):
+            yield response
+        else:
+            yield from response
+
+    def _respond(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> AgentResponse:
+        """Route the message to the handler for the type of assistance needed"""
+        assistance_type = self._analyze_assistance_type(message)
+        
+        if assistance_type == 'legal_advice':
+            return self._provide_legal_guidance(case_id, message, conversation_history)
+        elif assistance_type == 'case_strategy':
+            return self._provide_case_strategy(case_id, message)
+        elif assistance_type == 'procedure_guidance':
+            return self._provide_procedure_guidance(message)
+        elif assistance_type == 'research_help':
+            return self._provide_research_assistance(case_id, message)
+        elif assistance_type == 'risk_assessment':
+            return self._provide_risk_assessment(case_id, message)
+        elif assistance_type == 'settlement_analysis':
+            return self._provide_settlement_analysis(case_id, message)
+        elif assistance_type == 'timeline_guidance':
+            return self._provide_timeline_guidance(case_id, message)
+        else:
+            return self._general_legal_assistance(case_id, message, conversation_history)
 
-    def analyze_case_insights(self, case_id: str, case_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Analyze case for AI insights"""
+    def _analyze_assistance_type(self, message: str) -> str:
+        """Analyze message to determine type of assistance needed"""
+        best = None
+        
+        for match in _ASSISTANCE_RE.finditer(message.lower()):
+            priority, category = _KEYWORD_CATEGORY[match.group(1)]
+            if best is None or priority < best[0]:
+                best = (priority, category)
+                if priority == 0:
+                    break
+        
+        return best[1] if best else 'general_assistance'
+
+    def _provide_legal_guidance(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> AgentResponse:
+        """Provide general legal guidance"""
         try:
-            case_context = self.document_tool.get_case_context(case_id)
+            if self.model is None:
+                return self._fallback('legal', message, self._get_case_data(case_id))
+            
+            case_future = self._io_pool.submit(self._get_case_data, case_id)
+            context_future = self._io_pool.submit(self.document_tool.get_case_context, case_id)
+            case_data, case_context = case_future.result(), context_future.result()
             
-            prompt = f"""
-            Please analyze this legal case and provide insights:
+            # Build conversation context
+            context = ""
+            if conversation_history:
+                parts = ["Previous conversation context:"]
+                for msg in conversation_history[-3:]:
+                    role = "User" if msg.get('type') == 'user' else "Assistant"
+                    parts.append(f"{role}: {msg.get('message', '')}")
+                context = "\n".join(parts) + "\n"
+            
+            prompt = _LEGAL_GUIDANCE_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General'),
+                status=case_data.get('status', 'Active'),
+                case_context=self._trim_context(case_context),
+                context=context
+            )
+            
+            stream = self._stream_response(prompt, "⚖️ **Legal Guidance**\n\n", "\n\n📋 **Disclaimer:** This guidance is for informational purposes only and does not constitute formal legal advice. Please consult with qualified legal counsel for specific legal decisions.")
+            if stream:
+                return stream
+            
+            return self._fallback('legal', message, case_data)
+            
+        except Exception as e:
+            logger.error(f"Legal guidance error: {e}")
+            return "I encountered an error while providing legal guidance. Please try rephrasing your question or provide more specific details."
 
-            Case: {case_data.get('title', 'Legal Matter')}
-            Type: {case_data.get('type', 'General')}
-            Status: {case_data.get('status', 'Active')}
+    def _provide_case_strategy(self, case_id: str, message: str) -> AgentResponse:
+        """Provide case strategy advice"""
+        try:
+            if self.model is None:
+                return self._fallback('strategy', message, self._get_case_data(case_id))
+            
+            case_future = self._io_pool.submit(self._get_case_data, case_id)
+            analysis_future = self._io_pool.submit(self._get_recent_case_analysis, case_id)
+            case_data, case_analysis = case_future.result(), analysis_future.result()
+            
+            prompt = _CASE_STRATEGY_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General'),
+                priority=case_data.get('priority', 'Medium'),
+                status=case_data.get('status', 'Active'),
+                case_analysis=case_analysis
+            )
+            
+            stream = self._stream_response(prompt, "🎯 **Case Strategy Advice**\n\n")
+            if stream:
+                return stream
+            
+            return self._fallback('strategy', message, case_data)
+            
+        except Exception as e:
+            logger.error(f"Case strategy error: {e}")
+            return "I encountered an error while providing strategy advice. Please provide more details about the strategic challenge you're facing."
 
-            Context:
-            {case_context}
+    def _provide_procedure_guidance(self, message: str) -> AgentResponse:
+        """Provide legal procedure guidance"""
+        try:
+            if self.model is None:
+                return self._fallback('procedure', message)
+            
+            prompt = _PROCEDURE_GUIDANCE_PROMPT.format(message=message)
+            
+            stream = self._stream_response(prompt, "📋 **Procedure Guidance**\n\n", "\n\n⚠️ **Important:** Procedural rules can vary by jurisdiction and change over time. Always verify current local rules and requirements.")
+            if stream:
+                return stream
+            
+            return self._fallback('procedure', message)
+            
+        except Exception as e:
+            logger.error(f"Procedure guidance error: {e}")
+            return "I encountered an error while providing procedure guidance. Please be more specific about the legal procedure you need help with."
 
-            Please provide:
-            1. Key topics and themes (list of 5-7 topics)
-            2. Recent activity summary (brief description)
-            3. Suggested actions (3-5 actionable recommendations)
-            4. Risk factors (3-5 potential risks)
-            5. Opportunities (3-5 potential opportunities or advantages)
+    def _provide_research_assistance(self, case_id: str, message: str) -> AgentResponse:
+        """Provide legal research assistance"""
+        try:
+            if self.model is None:
+                return self._fallback('research', message)
+            
+            case_data = self._get_case_data(case_id)
+            
+            prompt = _RESEARCH_ASSISTANCE_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General')
+            )
+            
+            stream = self._stream_response(prompt, "🔍 **Legal Research Assistance**\n\n")
+            if stream:
+                return stream
+            
+            return self._fallback('research', message)
+            
+        except Exception as e:
+            logger.error(f"Research assistance error: {e}")
+            return "I encountered an error while providing research assistance. Please specify what legal topic or issue you need help researching."
 
-            Format as structured data that can be parsed.
-            """
+    def _provide_risk_assessment(self, case_id: str, message: str) -> AgentResponse:
+        """Provide risk assessment"""
+        try:
+            if self.model is None:
+                return self._fallback('risk', message, self._get_case_data(case_id))
+            
+            case_future = self._io_pool.submit(self._get_case_data, case_id)
+            analysis_future = self._io_pool.submit(self._get_recent_case_analysis, case_id)
+            case_data, case_analysis = case_future.result(), analysis_future.result()
+            
+            prompt = _RISK_ASSESSMENT_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General'),
+                case_analysis=case_analysis
+            )
+            
+            stream = self._stream_response(prompt, "⚠️ **Risk Assessment**\n\n")
+            if stream:
+                return stream
+            
+            return self._fallback('risk', message, case_data)
+            
+        except Exception as e:
+            logger.error(f"Risk assessment error: {e}")
+            return "I encountered an error while assessing risks. Please provide more specific details about the risks or concerns you'd like me to analyze."
+
+    def _provide_settlement_analysis(self, case_id: str, message: str) -> AgentResponse:
+        """Provide settlement analysis"""
+        try:
+            if self.model is None:
+                return self._fallback('settlement', message)
+            
+            case_future = self._io_pool.submit(self._get_case_data, case_id)
+            context_future = self._io_pool.submit(self.document_tool.get_case_context, case_id)
+            case_data, case_context = case_future.result(), context_future.result()
+            
+            prompt = _SETTLEMENT_ANALYSIS_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General'),
+                case_context=self._trim_context(case_context)
+            )
+            
+            stream = self._stream_response(prompt, "🤝 **Settlement Analysis**\n\n")
+            if stream:
+                return stream
+            
+            return self._fallback('settlement', message, case_data)
+            
+        except Exception as e:
+            logger.error(f"Settlement analysis error: {e}")
+            return "I encountered an error while analyzing settlement options. Please provide more details about the settlement situation you're considering."
+
+    def _provide_timeline_guidance(self, case_id: str, message: str) -> AgentResponse:
+        """Provide timeline and deadline guidance"""
+        try:
+            if self.model is None:
+                return self._fallback('timeline', message, self._get_case_data(case_id))
+            
+            case_data = self._get_case_data(case_id)
+            
+            prompt = _TIMELINE_GUIDANCE_PROMPT.format(
+                message=message,
+                title=case_data.get('title', 'Legal Matter'),
+                case_type=case_data.get('type', 'General'),
+                created_at=case_data.get('createdAt', 'Unknown')
+            )
+            
+            stream = self._stream_response(prompt, "📅 **Timeline Guidance**\n\n")
+            if stream:
+                return stream
+            
+            return self._fallback('timeline', message, case_data)
+            
+        except Exception as e:
+            logger.error(f"Timeline guidance error: {e}")
+            return "I encountered an error while providing timeline guidance. Please specify what timeline or deadline questions you have."
+
+    def _general_legal_assistance(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> AgentResponse:
+        """Provide general legal assistance"""
+        try:
+            if self.model is None:
+                return self._fallback('general', message)
+            
+            case_context = self.document_tool.get_case_context(case_id)
+            
+            prompt = _GENERAL_ASSISTANCE_PROMPT.format(
+                message=message,
+                case_context=self._trim_context(case_context)
+            )
             
+            stream = self._stream_response(prompt)
+            if stream:
+                return stream
+            
+            return self._fallback('general', message)
+            
+        except Exception as e:
+            logger.error(f"General legal assistance error: {e}")
+            return "I'm here to help with your legal questions. Could you please provide more details or rephrase your question so I can better assist you?"
+
+    def analyze_case_insights(self, case_id: str, case_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Analyze case for AI insights"""
+        try:
             if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    # Parse response into structured data
-                    return self._parse_insights_response(response.text)
+                insights = self._get_case_insights(case_id, case_data)
+                if insights:
+                    return insights
             
             return self._create_basic_insights(case_data)
             
@@ -458,37 +608,183 @@ class GeneralAgent:
             logger.error(f"Case insights analysis error: {e}")
             return None
 
+    def _get_case_insights(self, case_id: str, case_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get Gemini insights for a case, reusing a recent result.
+
+        Document context is not part of the cache key, so newly processed
+        documents show up only once the entry expires (INSIGHTS_CACHE_TTL).
+        """
+        fields = (
+            case_data.get('title', 'Legal Matter'),
+            case_data.get('type', 'General'),
+            case_data.get('status', 'Active'),
+            case_data.get('priority', 'Medium')
+        )
+        key = (case_id,) + fields
+        
+        with self._case_lock:
+            insights = self._insights_cache.get(key)
+        if insights is not None:
+            return insights
+        
+        title, case_type, status, priority = fields
+        prompt = _CASE_INSIGHTS_PROMPT.format(
+            title=title,
+            case_type=case_type,
+            status=status,
+            priority=priority,
+            case_context=self._trim_context(self.document_tool.get_case_context(case_id))
+        )
+        text = self._cached_generate(prompt)
+        if not text:
+            return None
+        
+        insights = self._parse_insights_response(text)
+        with self._case_lock:
+            self._insights_cache[key] = insights
+        return insights
+
     # Helper methods
+    def _cached_generate(self, prompt: str) -> str:
+        """Generate a Gemini response, reusing a recent response for an identical prompt"""
+        key = self._prompt_key(prompt)
+        
+        with self._resp_lock:
+            text = self._resp_cache.get(key)
+        if text is not None:
+            return text
+        
+        response = self.model.generate_content(prompt)
+        return self._store_response(key, response.text)
+
+    def _stream_response(self, prompt: str, header: str = "", footer: str = "") -> Optional[Iterator[str]]:
+        """Start streaming a Gemini response framed by header/footer; None if Gemini returns nothing.
+
+        Blocks only until the first chunk arrives, so the caller can still choose a fallback.
+        """
+        chunks = self._stream_generate(prompt)
+        first = next(chunks, "")
+        if not first:
+            return None
+        return itertools.chain((header, first), chunks, (footer,) if footer else ())
+
+    def _stream_generate(self, prompt: str) -> Iterator[str]:
+        """Yield Gemini response chunks as they arrive, caching the complete response"""
+        key = self._prompt_key(prompt)
+        
+        with self._resp_lock:
+            text = self._resp_cache.get(key)
+        if text is not None:
+            yield text
+            return
+        
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+        self._store_response(key, ''.join(parts))
+
+    def _trim_context(self, text: str, max_chars: int = CONTEXT_MAX_CHARS) -> str:
+        """Bound case context size, keeping its head and tail"""
+        if len(text) <= max_chars:
+            return text
+        half = max_chars // 2
+        return text[:half] + "\n...[truncated]...\n" + text[-half:]
+
+    def _prompt_key(self, prompt: str) -> bytes:
+        """Response cache key for a prompt"""
+        return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).digest()
+
+    def _store_response(self, key: bytes, text: str) -> str:
+        """Cache a non-empty Gemini response and return it"""
+        if text:
+            with self._resp_lock:
+                self._resp_cache[key] = text
+        return text
+
     def _get_case_data(self, case_id: str) -> Dict[str, Any]:
         """Get case data from Firestore"""
+        with self._case_lock:
+            case_data = self._case_cache.get(case_id)
+        if case_data is not None:
+            return case_data
+        
         try:
             case_ref = self.firestore_client.collection('cases').document(case_id)
             case_doc = case_ref.get()
-            return case_doc.to_dict() if case_doc.exists else {}
+            if not case_doc.exists:
+                return {}
+            
+            case_data = case_doc.to_dict()
+            with self._case_lock:
+                self._case_cache[case_id] = case_data
+            return case_data
         except Exception as e:
             logger.error(f"Error getting case data: {e}")
             return {}
 
     def _get_recent_case_analysis(self, case_id: str) -> str:
         """Get recent case analysis if available"""
+        with self._case_lock:
+            analysis = self._analysis_cache.get(case_id)
+        if analysis is not None:
+            return analysis
+        
         try:
-            analysis_query = self.firestore_client.collection('case_analysis')\
+            analysis_query = self._analysis_collection\
                 .where('caseId', '==', case_id)\
-                .order_by('analyzedAt', direction='DESCENDING')\
+                .order_by('analyzedAt', direction=firestore.Query.DESCENDING)\
                 .limit(1)
             
-            docs = analysis_query.get()
-            if docs:
-                analysis = docs[0].to_dict()
-                return f"Executive Summary: {analysis.get('executiveSummary', 'No analysis available')}"
+            latest = next(iter(analysis_query.stream()), None)
+            if latest is not None:
+                analysis_data = latest.to_dict()
+                analysis = f"Executive Summary: {analysis_data.get('executiveSummary', 'No analysis available')}"
+            else:
+                analysis = "No recent case analysis available."
             
-            return "No recent case analysis available."
+            with self._case_lock:
+                self._analysis_cache[case_id] = analysis
+            return analysis
         except Exception as e:
             logger.error(f"Error getting case analysis: {e}")
             return "Case analysis information unavailable."
 
     def _parse_insights_response(self, response: str) -> Dict[str, Any]:
-        """Parse AI insights response into structured data"""
+        """Parse an insights response, preferring the requested JSON object"""
+        data = self._load_json_object(response)
+        if data is None:
+            # Model ignored the JSON instruction; salvage the text sections
+            return self._parse_insights_text(response)
+        
+        return self._normalize_insights(data)
+
+    def _load_json_object(self, response: str) -> Optional[Dict[str, Any]]:
+        """Decode a JSON object response, or return None if it is not one"""
+        try:
+            data = json.loads(_JSON_FENCE_RE.sub('', response.strip()))
+        except ValueError:
+            return None
+        
+        return data if isinstance(data, dict) else None
+
+    def _normalize_insights(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Coerce decoded insights into the expected keys and types"""
+        def as_list(key):
+            value = data.get(key)
+            return [str(item) for item in value if item] if isinstance(value, list) else []
+        
+        return {
+            'keyTopics': as_list('keyTopics'),
+            'recentActivity': str(data.get('recentActivity') or ''),
+            'suggestedActions': as_list('suggestedActions'),
+            'riskFactors': as_list('riskFactors'),
+            'opportunities': as_list('opportunities')
+        }
+
+    def _parse_insights_text(self, response: str) -> Dict[str, Any]:
+        """Parse a free-text insights response section by section"""
         try:
             insights = {
                 'keyTopics': [],
@@ -498,33 +794,29 @@ class GeneralAgent:
                 'opportunities': []
             }
             
-            lines = response.split('\n')
             current_section = None
+            activity_lines = []
             
-            for line in lines:
+            for line in response.split('\n'):
                 line = line.strip()
                 if not line:
                     continue
                 
                 # Identify sections
-                if 'key topics' in line.lower() or 'topics' in line.lower():
-                    current_section = 'keyTopics'
-                elif 'recent activity' in line.lower() or 'activity' in line.lower():
-                    current_section = 'recentActivity'
-                elif 'suggested actions' in line.lower() or 'actions' in line.lower():
-                    current_section = 'suggestedActions'
-                elif 'risk factors' in line.lower() or 'risks' in line.lower():
-                    current_section = 'riskFactors'
-                elif 'opportunities' in line.lower():
-                    current_section = 'opportunities'
-                elif line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')):
+                headers = _INSIGHT_SECTION_RE.findall(line.lower())
+                if headers:
+                    current_section = min(_INSIGHT_SECTIONS[header] for header in headers)[1]
+                    continue
+                
+                bullet = _INSIGHT_BULLET_RE.match(line) if line[0] in _INSIGHT_BULLET_FIRST else None
+                if bullet:
                     # Extract list items
-                    item = line.split('.', 1)[-1].strip() if '.' in line else line[1:].strip()
-                    if current_section in ['keyTopics', 'suggestedActions', 'riskFactors', 'opportunities']:
-                        insights[current_section].append(item)
-                elif current_section == 'recentActivity' and not line.startswith(('1.', '2.', '3.')):
-                    insights['recentActivity'] += line + ' '
+                    if current_section in _INSIGHT_LIST_SECTIONS:
+                        insights[current_section].append(bullet.group(1).strip())
+                elif current_section == 'recentActivity':
+                    activity_lines.append(line)
             
+            insights['recentActivity'] = ' '.join(activity_lines)
             return insights
             
         except Exception as e:
@@ -562,304 +854,8 @@ class GeneralAgent:
         }
 
     # Fallback methods when AI is unavailable
-    def _fallback_legal_guidance(self, message: str, case_data: Dict) -> str:
-        return f"""⚖️ **Legal Guidance**
-
-**Your Question:** "{message}"
-
-**General Legal Considerations:**
-
-📋 **Key Principles:**
-- Every legal situation is unique and fact-specific
-- Legal outcomes depend on applicable laws and jurisdiction
-- Professional legal counsel is essential for important decisions
-- Documentation and evidence are critical
-
-🎯 **Recommended Approach:**
-1. **Gather Information**: Collect all relevant facts and documents
-2. **Research Applicable Law**: Identify relevant statutes and case law
-3. **Analyze Options**: Consider all available legal strategies
-4. **Assess Risks**: Evaluate potential outcomes and consequences
-5. **Seek Counsel**: Consult with qualified legal professionals
-
-⚠️ **Important Considerations for {case_data.get('type', 'Legal')} matters:**
-- Jurisdiction-specific requirements
-- Applicable statutes of limitations
-- Procedural requirements and deadlines
-- Potential liability and risk factors
-
-📋 **Next Steps:**
-- Document all relevant facts
-- Research applicable legal standards
-- Consider engaging specialized counsel
-- Develop comprehensive strategy
-
-**Disclaimer:** This guidance is for informational purposes only and does not constitute formal legal advice."""
-
-    def _fallback_strategy_guidance(self, message: str, case_data: Dict) -> str:
-        return f"""🎯 **Case Strategy Framework**
-
-**Your Strategic Question:** "{message}"
-
-**Strategic Analysis Framework:**
-
-📊 **Case Assessment:**
-- Current case status: {case_data.get('status', 'Active')}
-- Case type: {case_data.get('type', 'General')}
-- Priority level: {case_data.get('priority', 'Medium')}
-
-🎯 **Strategic Objectives:**
-1. **Primary Goals**: Define desired outcomes
-2. **Success Metrics**: Establish measurable criteria
-3. **Timeline Targets**: Set realistic deadlines
-4. **Resource Allocation**: Plan staffing and budget
-
-⚡ **Tactical Considerations:**
-- **Evidence Strategy**: Gather and organize supporting evidence
-- **Legal Research**: Identify favorable precedents and authorities
-- **Risk Management**: Minimize exposure and vulnerabilities
-- **Stakeholder Management**: Coordinate with all parties
-
-📅 **Implementation Steps:**
-1. Conduct comprehensive case analysis
-2. Develop detailed action plan
-3. Assign responsibilities and deadlines
-4. Monitor progress and adjust as needed
-
-💡 **Best Practices:**
-- Regular strategy review and adjustment
-- Clear communication with all team members
-- Contingency planning for various scenarios
-- Documentation of all strategic decisions"""
-
-    def _fallback_procedure_guidance(self, message: str) -> str:
-        return f"""📋 **Legal Procedure Guidance**
-
-**Your Procedural Question:** "{message}"
-
-**General Procedural Framework:**
-
-📝 **Planning Phase:**
-1. **Identify Requirements**: Determine applicable rules and procedures
-2. **Check Deadlines**: Note all relevant time limits and deadlines
-3. **Gather Documents**: Collect all necessary forms and supporting materials
-4. **Verify Jurisdiction**: Ensure proper court or administrative body
-
-⚖️ **Execution Phase:**
-1. **Prepare Documents**: Draft all required pleadings or applications
-2. **File Properly**: Submit documents according to local rules
-3. **Serve Parties**: Provide proper notice to all required parties
-4. **Track Deadlines**: Monitor all response and action deadlines
-
-🔍 **Key Considerations:**
-- **Local Rules**: Each jurisdiction may have specific requirements
-- **Standing Requirements**: Verify authority to bring action
-- **Service of Process**: Ensure proper notification procedures
-- **Fee Requirements**: Prepare for applicable filing fees
-
-⚠️ **Common Pitfalls to Avoid:**
-- Missing critical deadlines
-- Improper service of process
-- Incomplete or incorrect documentation
-- Failure to follow local court rules
-
-📚 **Resources:**
-- Local court rules and procedures
-- State bar practice guides
-- Court clerk's office guidance
-- Legal research databases
-
-**Important:** Always verify current local rules and requirements, as procedures can vary significantly by jurisdiction."""
-
-    def _fallback_research_guidance(self, message: str) -> str:
-        return f"""🔍 **Legal Research Strategy**
-
-**Your Research Question:** "{message}"
-
-**Research Methodology:**
-
-📚 **Primary Sources (Start Here):**
-1. **Statutes**: Relevant federal and state statutes
-2. **Regulations**: Administrative rules and regulations
-3. **Case Law**: Controlling and persuasive court decisions
-4. **Constitutional Provisions**: Applicable constitutional law
-
-📖 **Secondary Sources (For Context):**
-1. **Legal Treatises**: Comprehensive topic coverage
-2. **Law Review Articles**: Scholarly analysis and commentary
-3. **Practice Guides**: Practical implementation guidance
-4. **Legal Encyclopedias**: Broad topic overviews
-
-🔍 **Research Strategy:**
-1. **Start Broad**: Use secondary sources for background
-2. **Narrow Focus**: Identify specific legal issues
-3. **Find Primary Law**: Locate controlling authorities
-4. **Update Research**: Ensure current validity
-5. **Organize Findings**: Create systematic research notes
-
-💻 **Research Tools:**
-- **Legal Databases**: Westlaw, Lexis, Bloomberg Law
-- **Free Resources**: Google Scholar, Justia, FindLaw
-- **Court Websites**: Local court rules and decisions
-- **Government Sites**: Statutory and regulatory materials
-
-📋 **Research Tips:**
-- Use multiple search terms and approaches
-- Check for recent developments and updates
-- Verify jurisdiction-specific variations
-- Track your research path and sources
-
-🎯 **Organization:**
-- Create outline of legal issues
-- Categorize sources by relevance
-- Note citation information for all sources
-- Prepare summary of key findings"""
-
-    def _fallback_risk_assessment(self, message: str, case_data: Dict) -> str:
-        return f"""⚠️ **Risk Assessment Framework**
-
-**Your Risk Concern:** "{message}"
-
-**Risk Analysis Structure:**
-
-🎯 **Risk Categories:**
-
-**📋 Legal Risks:**
-- Adverse legal precedents
-- Jurisdictional challenges
-- Procedural compliance issues
-- Evidence admissibility problems
-
-**💰 Financial Risks:**
-- Litigation costs and expenses
-- Potential damages or penalties
-- Fee shifting provisions
-- Collection difficulties
-
-**⏰ Timeline Risks:**
-- Statute of limitations issues
-- Court scheduling delays
-- Discovery deadline pressures
-- Settlement timing considerations
-
-**👥 Operational Risks:**
-- Resource allocation challenges
-- Team coordination difficulties
-- Client relationship management
-- Public relations considerations
-
-🔍 **Risk Assessment Process:**
-1. **Identify**: List all potential risks
-2. **Assess**: Evaluate probability and impact
-3. **Prioritize**: Rank risks by severity
-4. **Mitigate**: Develop prevention strategies
-5. **Monitor**: Track risk factors over time
-
-📊 **Risk Mitigation Strategies:**
-- **Prevention**: Eliminate risk sources where possible
-- **Reduction**: Minimize risk probability or impact
-- **Transfer**: Use insurance or contractual protection
-- **Acceptance**: Acknowledge and plan for unavoidable risks
-
-💡 **Case-Specific Considerations for {case_data.get('type', 'Legal')} matters:**
-- Industry-specific regulatory requirements
-- Typical challenge areas and pitfalls
-- Standard mitigation approaches
-- Benchmark outcomes and expectations"""
-
-    def _fallback_settlement_analysis(self, message: str, case_data: Dict) -> str:
-        return f"""🤝 **Settlement Analysis Framework**
-
-**Your Settlement Question:** "{message}"
-
-**Settlement Evaluation Factors:**
-
-💰 **Valuation Components:**
-- **Economic Damages**: Quantifiable financial losses
-- **Non-Economic Damages**: Pain, suffering, reputation
-- **Punitive Damages**: If applicable in jurisdiction
-- **Attorney Fees**: Potential fee shifting or recovery
-
-⚖️ **Strength Assessment:**
-- **Liability Analysis**: Strength of legal claims
-- **Evidence Quality**: Supporting documentation and witnesses
-- **Legal Precedents**: Favorable vs. unfavorable case law
-- **Procedural Advantages**: Discovery, motion practice
-
-🎯 **Settlement Considerations:**
-- **Cost-Benefit Analysis**: Settlement vs. litigation costs
-- **Time Factors**: Resolution timeline preferences
-- **Risk Tolerance**: Client's appetite for uncertainty
-- **Relationship Preservation**: Ongoing business relationships
-
-📊 **Negotiation Strategy:**
-1. **Preparation**: Research opponent's position and constraints
-2. **Opening Position**: Set initial offer or demand strategically
-3. **Concession Planning**: Plan negotiation moves and limits
-4. **Alternative Solutions**: Consider creative resolution options
-5. **Implementation**: Structure enforceable settlement terms
-
-⏰ **Timing Considerations:**
-- **Early Settlement**: Lower costs, less risk, limited information
-- **Post-Discovery**: More information, higher costs, better case assessment
-- **Pre-Trial**: Final opportunity, maximum pressure, highest costs
-
-💡 **Best Practices:**
-- Document all settlement discussions appropriately
-- Consider tax implications of settlement terms
-- Plan for enforcement and compliance mechanisms
-- Maintain confidentiality as required"""
-
-    def _fallback_timeline_guidance(self, message: str, case_data: Dict) -> str:
-        return f"""📅 **Timeline Management Framework**
-
-**Your Timeline Question:** "{message}"
-
-**Case Timeline Structure:**
-
-🎯 **Phase-Based Planning:**
-
-**📋 Phase 1: Case Initiation (0-30 days)**
-- Case setup and initial assessment
-- Document collection and organization
-- Initial research and strategy development
-- Team assignment and coordination
-
-**🔍 Phase 2: Discovery & Analysis (1-6 months)**
-- Comprehensive document review
-- Evidence gathering and analysis
-- Legal research and case law review
-- Initial witness interviews and evidence preservation
-
-**⚙️ Phase 3: Motion Practice & Pre-Trial (3-9 months)**
-- File and respond to dispositive and discovery motions
-- Narrow issues through motions in limine and procedural filings
-- Focused depositions and expert identification
-- Prepare exhibits and trial notebooks
-
-**🏛️ Phase 4: Trial Preparation & Trial (6-12+ months)**
-- Finalize witness lists and trial strategy
-- Conduct mock examinations and trial runs
-- Prepare jury instructions and trial briefs (if applicable)
-- Execute trial presentation and evidence admission
-
-**🔁 Phase 5: Post-Trial & Resolution**
-- Prepare for post-trial motions or appeals as needed
-- Implement settlement or enforcement steps
-- Close out case files and document lessons learned
-
-**📋 Practical Tips:**
-- Build a timeline with milestones, owners, and buffer time for each task
-- Track court deadlines and statutory limitations closely
-- Allocate resources early for high-priority tasks (e.g., expert work)
-- Maintain regular status updates with the team and client
-
-**📌 Case Context:** {case_data.get('type', 'Legal')} matter; adjust timelines based on jurisdictional rules and case complexity.
-
-**Next Steps:**
-1. Create a detailed milestone plan with dates and responsible parties
-2. Identify critical path tasks and assign extra buffer time
-3. Monitor progress weekly and adjust the timeline as new information arrives
-4. Consider early settlement discussions if it aligns with client goals
-
-**Important:** Timelines vary widely by jurisdiction and case specifics; always verify local rules and court schedules when planning."""
\ No newline at end of file
+    def _fallback(self, kind: str, message: str, case_data: Optional[Dict] = None) -> str:
+        """Render the static fallback response of the given kind"""
+        # Imported on first use so processes whose Gemini calls never fail skip loading it
+        from . import fallbacks
+        return fallbacks.render(kind, message, case_data)
\ No newline at end of file
@@ -1,130 +1,65 @@
 #services/ai-agent-service/src/agents/summary_agent.py
+import hashlib
+import itertools
 import logging
-import time
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from cachetools import TTLCache
+from .gemini import get_model
 
 logger = logging.getLogger(__name__)
 
-class SummaryAgent:
-    """AI agent specialized in case summarization and overview"""
-    
-    def __init__(self, firestore_client, document_tool):
-        self.firestore_client = firestore_client
-        self.document_tool = document_tool
-        
-        # Initialize Gemini
-        try:
-            api_key = os.environ.get('GOOGLE_AI_API_KEY')
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-2.5-pro')
-            else:
-                self.model = None
-                logger.warning("⚠️ Gemini API key not found, using fallback responses")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini: {e}")
-            self.model = None
-        
-        logger.info("✅ SummaryAgent initialized")
-
-    def test_connection(self):
-        """Test agent connection"""
-        try:
-            if self.model:
-                response = self.model.generate_content("Test summary agent")
-                return bool(response.text)
-            return True
-        except Exception as e:
-            logger.error(f"Summary agent test failed: {e}")
-            raise
-
-    def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[str]:
-        """Process message for summary-related queries"""
-        try:
-            logger.info(f"📋 SummaryAgent processing message for case {case_id}")
-            
-            # Analyze the message to determine the type of summary request
-            request_type = self._analyze_request_type(message)
-            
-            if request_type == 'case_overview':
-                return self._generate_case_overview(case_id)
-            elif request_type == 'document_summary':
-                return self._generate_document_summary(case_id, message)
-            elif request_type == 'status_update':
-                return self._generate_status_update(case_id)
-            elif request_type == 'key_issues':
-                return self._summarize_key_issues(case_id)
-            elif request_type == 'progress_summary':
-                return self._generate_progress_summary(case_id)
-            elif request_type == 'conversation_summary':
-                return self._summarize_conversation(conversation_history)
-            else:
-                return self._general_summary_assistance(case_id, message, conversation_history)
-                
-        except Exception as e:
-            logger.error(f"❌ SummaryAgent error: {e}")
-            return "I encountered an error while generating the summary. Please try rephrasing your request or contact support if the issue persists."
-
-    def _analyze_request_type(self, message: str) -> str:
-        """Analyze the message to determine the type of summary request"""
-        message_lower = message.lower()
-        
-        # Case overview keywords
-        if any(word in message_lower for word in ['overview', 'case summary', 'overall', 'big picture', 'case status']):
-            return 'case_overview'
-        
-        # Document summary keywords  
-        if any(word in message_lower for word in ['document summary', 'summarize documents', 'document overview']):
-            return 'document_summary'
-        
-        # Status update keywords
-        if any(word in message_lower for word in ['status', 'update', 'current state', 'where are we']):
-            return 'status_update'
-        
-        # Key issues keywords
-        if any(word in message_lower for word in ['key issues', 'main issues', 'important points', 'highlights']):
-            return 'key_issues'
-        
-        # Progress keywords
-        if any(word in message_lower for word in ['progress', 'advancement', 'milestones', 'achievements']):
-            return 'progress_summary'
-        
-        # Conversation summary keywords
-        if any(word in message_lower for word in ['conversation', 'discussion', 'chat summary', 'what we discussed']):
-            return 'conversation_summary'
-        
-        return 'general_summary'
-
-    def _generate_case_overview(self, case_id: str) -> str:
-        """Generate comprehensive case overview"""
-        try:
-            # Get case data
-            case_data = self._get_case_data(case_id)
-            if not case_data:
-                return "I couldn't find this case. Please make sure you're in the correct case chat."
-            
-            # Get documents summary
-            documents_summary = self.document_tool.get_case_documents_summary(case_id)
-            
-            # Get recent analysis if available
-            recent_analysis = self._get_recent_case_analysis(case_id)
-            
-            prompt = f"""
+# (prompt or None to skip Gemini, response header, fallback reply)
+SummaryRequest = Tuple[Optional[str], str, Callable[[], str]]
+
+# Summary request types in priority order: the first type with a keyword
+# anywhere in the message wins.
+_REQUEST_KEYWORDS = (
+    ('case_overview', ('overview', 'case summary', 'overall', 'big picture', 'case status')),
+    ('document_summary', ('document summary', 'summarize documents', 'document overview')),
+    ('status_update', ('status', 'update', 'current state', 'where are we')),
+    ('key_issues', ('key issues', 'main issues', 'important points', 'highlights')),
+    ('progress_summary', ('progress', 'advancement', 'milestones', 'achievements')),
+    ('conversation_summary', ('conversation', 'discussion', 'chat summary', 'what we discussed')),
+)
+
+# keyword -> (priority, request type)
+_KEYWORD_REQUEST_TYPE = {}
+for _priority, (_request_type, _keywords) in enumerate(_REQUEST_KEYWORDS):
+    for _keyword in _keywords:
+        _KEYWORD_REQUEST_TYPE.setdefault(_keyword, (_priority, _request_type))
+
+# One scan over the message finds every keyword occurrence; see
+# general_agent._ASSISTANCE_RE for why the lookahead and ordering are needed.
+_REQUEST_RE = re.compile('(?=({}))'.format('|'.join(
+    re.escape(keyword) for keyword in sorted(
+        _KEYWORD_REQUEST_TYPE, key=lambda k: (_KEYWORD_REQUEST_TYPE[k][0], -len(k))
+    )
+)))
+
+# Extracted document text is full of padding (column alignment, page breaks);
+# collapsing it keeps the same content in fewer prompt tokens
+_HORIZONTAL_SPACE_RE = re.compile(r'[ \t\f\v\xa0]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# Prompt templates, formatted per call with the case-specific fields
+_CASE_OVERVIEW_PROMPT = """
             Please provide a comprehensive case overview for this legal case:
 
             Case Information:
-            - Title: {case_data.get('title', 'Untitled Case')}
-            - Type: {case_data.get('type', 'General')}
-            - Status: {case_data.get('status', 'Active')}
-            - Created: {case_data.get('createdAt', 'Unknown')}
-            - Priority: {case_data.get('priority', 'Medium')}
-            - Description: {case_data.get('description', 'No description available')}
+            - Title: {title}
+            - Type: {case_type}
+            - Status: {status}
+            - Created: {created}
+            - Priority: {priority}
+            - Description: {description}
 
-            Documents: {len(documents_summary.split('Document:')) - 1 if documents_summary else 0} documents uploaded
+            Documents: {doc_count} documents uploaded
 
-            {f"Recent Analysis: {recent_analysis}" if recent_analysis else ""}
+            {recent_analysis}
 
             Please provide an overview that includes:
             1. **Case Background**: Brief description and context
@@ -135,28 +70,8 @@ class SummaryAgent:
 
             Keep it concise but comprehensive for legal professionals.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📋 **Case Overview: {case_data.get('title', 'Untitled Case')}**\n\n{response.text}"
-            
-            return self._create_basic_case_overview(case_data, documents_summary)
-            
-        except Exception as e:
-            logger.error(f"Case overview generation error: {e}")
-            return "I encountered an error while generating the case overview. Please try again."
 
-    def _generate_document_summary(self, case_id: str, message: str) -> str:
-        """Generate summary of case documents"""
-        try:
-            # Get documents data
-            documents = self.document_tool.get_case_documents_detailed(case_id)
-            
-            if not documents:
-                return "There are no documents in this case yet. Please upload documents to get a summary."
-            
-            prompt = f"""
+_DOCUMENT_SUMMARY_PROMPT = """
             Please provide a summary of the documents in this legal case:
 
             User request: "{message}"
@@ -174,43 +89,19 @@ class SummaryAgent:
 
             Focus on helping legal professionals understand the document landscape.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📄 **Document Summary**\n\n{response.text}"
-            
-            return self._create_basic_document_summary(documents)
-            
-        except Exception as e:
-            logger.error(f"Document summary generation error: {e}")
-            return "I encountered an error while summarizing the documents. Please try again."
 
-    def _generate_status_update(self, case_id: str) -> str:
-        """Generate current case status update"""
-        try:
-            case_data = self._get_case_data(case_id)
-            if not case_data:
-                return "I couldn't access the case information for the status update."
-            
-            # Get recent activities
-            recent_activities = self._get_recent_activities(case_id)
-            
-            # Get document counts
-            doc_counts = self.document_tool.get_document_statistics(case_id)
-            
-            prompt = f"""
+_STATUS_UPDATE_PROMPT = """
             Please provide a current status update for this legal case:
 
-            Case: {case_data.get('title', 'Untitled Case')}
-            Status: {case_data.get('status', 'Active')}
-            Last Updated: {case_data.get('updatedAt', 'Unknown')}
+            Case: {title}
+            Status: {status}
+            Last Updated: {updated}
 
             Document Statistics:
             {doc_counts}
 
             Recent Activities:
-            {recent_activities}
+            {activities}
 
             Please provide a status update including:
             1. **Current Phase**: What stage the case is in
@@ -222,32 +113,12 @@ class SummaryAgent:
 
             Keep it professional and actionable.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📊 **Status Update - {case_data.get('title', 'Case')}**\n\n{response.text}"
-            
-            return self._create_basic_status_update(case_data, doc_counts)
-            
-        except Exception as e:
-            logger.error(f"Status update generation error: {e}")
-            return "I encountered an error while generating the status update. Please try again."
 
-    def _summarize_key_issues(self, case_id: str) -> str:
-        """Summarize key issues in the case"""
-        try:
-            case_data = self._get_case_data(case_id)
-            documents_content = self.document_tool.get_documents_for_analysis(case_id, limit=5000)
-            
-            if not documents_content:
-                return "I need case documents to identify key issues. Please upload relevant documents first."
-            
-            prompt = f"""
+_KEY_ISSUES_PROMPT = """
             Based on this legal case, please identify and summarize the key issues:
 
-            Case: {case_data.get('title', 'Untitled Case')}
-            Type: {case_data.get('type', 'General')}
+            Case: {title}
+            Type: {case_type}
 
             Document Content:
             {documents_content}
@@ -262,33 +133,13 @@ class SummaryAgent:
 
             For each issue, provide a brief explanation and its significance to the case.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"🎯 **Key Issues Analysis**\n\n{response.text}"
-            
-            return "I've reviewed the available information. To provide a detailed key issues summary, I recommend having more specific case documents available for analysis."
-            
-        except Exception as e:
-            logger.error(f"Key issues summarization error: {e}")
-            return "I encountered an error while analyzing key issues. Please try again."
 
-    def _generate_progress_summary(self, case_id: str) -> str:
-        """Generate case progress summary"""
-        try:
-            case_data = self._get_case_data(case_id)
-            activities = self._get_case_activities(case_id)
-            
-            created_date = case_data.get('createdAt', 'Unknown')
-            current_status = case_data.get('status', 'Active')
-            
-            prompt = f"""
+_PROGRESS_SUMMARY_PROMPT = """
             Please provide a progress summary for this legal case:
 
-            Case: {case_data.get('title', 'Untitled Case')}  
-            Created: {created_date}
-            Current Status: {current_status}
+            Case: {title}  
+            Created: {created}
+            Current Status: {status}
             
             Activities and Progress:
             {activities}
@@ -303,33 +154,8 @@ class SummaryAgent:
 
             Focus on measurable progress and concrete achievements.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"📈 **Progress Summary**\n\n{response.text}"
-            
-            return self._create_basic_progress_summary(case_data, activities)
-            
-        except Exception as e:
-            logger.error(f"Progress summary generation error: {e}")
-            return "I encountered an error while generating the progress summary. Please try again."
 
-    def summarize_conversation(self, messages: List[Dict]) -> str:
-        """Summarize conversation history"""
-        try:
-            if not messages:
-                return "No conversation to summarize yet. Start by asking me questions about your case!"
-            
-            # Format messages for analysis
-            conversation_text = ""
-            for msg in messages[-10:]:  # Last 10 messages
-                role = "User" if msg.get('type') == 'user' else "Assistant"
-                timestamp = msg.get('timestamp', time.time())
-                content = msg.get('message', '')
-                conversation_text += f"{role}: {content}\n"
-            
-            prompt = f"""
+_CONVERSATION_SUMMARY_PROMPT = """
             Please provide a summary of this conversation between a user and legal AI assistants:
 
             Conversation:
@@ -344,24 +170,8 @@ class SummaryAgent:
 
             Keep the summary concise and focused on the legal aspects.
             """
-            
-            if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return f"💬 **Conversation Summary**\n\n{response.text}"
-            
-            return self._create_basic_conversation_summary(messages)
-            
-        except Exception as e:
-            logger.error(f"Conversation summary error: {e}")
-            return "I encountered an error while summarizing the conversation. Please try again."
 
-    def _general_summary_assistance(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> str:
-        """Provide general summary assistance"""
-        try:
-            case_context = self.document_tool.get_case_context(case_id)
-            
-            prompt = f"""
+_GENERAL_SUMMARY_PROMPT = """
             As a legal case summarization specialist, please help with this request:
 
             User request: "{message}"
@@ -378,25 +188,384 @@ class SummaryAgent:
 
             Keep your response practical and actionable for legal professionals.
             """
-            
+
+class SummaryAgent:
+    """AI agent specialized in case summarization and overview"""
+    
+    RESPONSE_CACHE_SIZE = 512
+    RESPONSE_CACHE_TTL = 300  # seconds
+    CASE_CACHE_SIZE = 4096
+    CASE_CACHE_TTL = 30  # seconds
+    ACTIVITY_LIMIT = 20
+    FALLBACK_ACTIVITY_LIMIT = 5  # the basic progress summary only lists them
+    
+    # request type -> (prepare method, log label, error reply)
+    _HANDLERS = {
+        'case_overview': ('_prepare_case_overview', "Case overview generation", "I encountered an error while generating the case overview. Please try again."),
+        'document_summary': ('_prepare_document_summary', "Document summary generation", "I encountered an error while summarizing the documents. Please try again."),
+        'status_update': ('_prepare_status_update', "Status update generation", "I encountered an error while generating the status update. Please try again."),
+        'key_issues': ('_prepare_key_issues', "Key issues summarization", "I encountered an error while analyzing key issues. Please try again."),
+        'progress_summary': ('_prepare_progress_summary', "Progress summary generation", "I encountered an error while generating the progress summary. Please try again."),
+        'conversation_summary': ('_prepare_conversation_summary', "Conversation summary", "I encountered an error while summarizing the conversation. Please try again."),
+        'general_summary': ('_prepare_general_summary', "General summary assistance", "I'm here to help with case summaries and overviews. Could you please be more specific about what type of summary you need?"),
+    }
+    
+    def __init__(self, firestore_client, document_tool):
+        self.firestore_client = firestore_client
+        self.document_tool = document_tool
+        
+        # Shared Gemini model (None when the API key is missing)
+        self.model = get_model()
+        
+        # Prompts embed the case fields they summarize, so an unchanged case hits the cache
+        self._resp_cache = TTLCache(maxsize=self.RESPONSE_CACHE_SIZE, ttl=self.RESPONSE_CACHE_TTL)
+        self._resp_lock = threading.Lock()
+        
+        # Case metadata changes rarely but is read by most summaries. Cases are edited
+        # by other services, so CASE_CACHE_TTL is the only bound on staleness.
+        self._case_cache = TTLCache(maxsize=self.CASE_CACHE_SIZE, ttl=self.CASE_CACHE_TTL)
+        # case_id -> (limit queried, activity lines newest first); shorter lists are served by slicing
+        self._activities_cache = TTLCache(maxsize=self.CASE_CACHE_SIZE, ttl=self.CASE_CACHE_TTL)
+        self._case_lock = threading.Lock()
+        
+        # Gemini calls in progress by prompt key, streamed or not; concurrent identical
+        # requests (e.g. several users opening the same case overview) wait on one call
+        self._inflight: Dict[bytes, Future] = {}
+        
+        # Runs independent Firestore reads of a single request concurrently
+        self._io_pool = ThreadPoolExecutor(max_workers=8)
+        
+        logger.info("✅ SummaryAgent initialized")
+
+    def test_connection(self):
+        """Test agent connection"""
+        try:
             if self.model:
-                response = self.model.generate_content(prompt)
-                if response.text:
-                    return response.text
+                response = self.model.generate_content("Test summary agent")
+                return bool(response.text)
+            return True
+        except Exception as e:
+            logger.error(f"Summary agent test failed: {e}")
+            raise
+
+    def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[str]:
+        """Process message for summary-related queries"""
+        try:
+            logger.info(f"📋 SummaryAgent processing message for case {case_id}")
             
-            return self._fallback_summary_guidance(message)
+            # Analyze the message to determine the type of summary request
+            request_type = self._analyze_request_type(message)
+            return self._summarize(request_type, case_id, message, conversation_history)
             
         except Exception as e:
-            logger.error(f"General summary assistance error: {e}")
-            return "I'm here to help with case summaries and overviews. Could you please be more specific about what type of summary you need?"
+            logger.error(f"❌ SummaryAgent error: {e}")
+            return "I encountered an error while generating the summary. Please try rephrasing your request or contact support if the issue persists."
+
+    def _analyze_request_type(self, message: str) -> str:
+        """Analyze the message to determine the type of summary request"""
+        best = None
+        
+        for match in _REQUEST_RE.finditer(message.lower()):
+            priority, request_type = _KEYWORD_REQUEST_TYPE[match.group(1)]
+            if best is None or priority < best[0]:
+                best = (priority, request_type)
+                if priority == 0:
+                    break
+        
+        return best[1] if best else 'general_summary'
+
+    def stream_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Iterator[str]:
+        """Process message for summary-related queries, yielding the response as Gemini generates it
+
+        Errors after the first chunk propagate, so callers can discard the partial reply.
+        """
+        try:
+            logger.info(f"📋 SummaryAgent streaming message for case {case_id}")
+            
+            request_type = self._analyze_request_type(message)
+            
+        except Exception as e:
+            logger.error(f"❌ SummaryAgent error: {e}")
+            yield "I encountered an error while generating the summary. Please try rephrasing your request or contact support if the issue persists."
+            return
+        
+        yield from self._stream_summarize(request_type, case_id, message, conversation_history)
+
+    def summarize_conversation(self, messages: List[Dict]) -> str:
+        """Summarize conversation history"""
+        return self._summarize('conversation_summary', None, "", messages)
+
+    def _summarize(self, request_type: str, case_id: str, message: str, conversation_history: List[Dict] = None) -> str:
+        """Prepare the request, run it through Gemini and fall back to a basic summary"""
+        prepare, label, error_reply = self._HANDLERS[request_type]
+        try:
+            prompt, header, fallback = getattr(self, prepare)(case_id, message, conversation_history)
+            
+            if prompt and self.model:
+                text = self._cached_generate(prompt)
+                if text:
+                    return header + text
+            
+            return fallback()
+            
+        except Exception as e:
+            logger.error(f"{label} error: {e}")
+            return error_reply
+
+    def _stream_summarize(self, request_type: str, case_id: str, message: str, conversation_history: List[Dict] = None) -> Iterator[str]:
+        """Streaming variant of _summarize; errors after the first chunk propagate"""
+        prepare, label, error_reply = self._HANDLERS[request_type]
+        try:
+            prompt, header, fallback = getattr(self, prepare)(case_id, message, conversation_history)
+            
+            stream = self._stream_response(prompt, header) if prompt and self.model else None
+            if not stream:
+                stream = (fallback(),)
+            
+        except Exception as e:
+            logger.error(f"{label} error: {e}")
+            yield error_reply
+            return
+        
+        yield from stream
+
+    def _cached_generate(self, prompt: str) -> str:
+        """Generate a Gemini response, reusing a recent response for an identical prompt"""
+        key = self._prompt_key(prompt)
+        
+        with self._resp_lock:
+            text = self._resp_cache.get(key)
+            if text is not None:
+                return text
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            response = self.model.generate_content(prompt)
+            text = self._store_response(key, response.text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._resp_lock:
+                del self._inflight[key]
+
+    def _stream_response(self, prompt: str, header: str = "") -> Optional[Iterator[str]]:
+        """Start streaming a Gemini response after header; None if Gemini returns nothing.
+
+        Blocks only until the first chunk arrives, so the caller can still choose a fallback.
+        """
+        chunks = self._stream_generate(prompt)
+        first = next(chunks, "")
+        if not first:
+            return None
+        return itertools.chain((header, first), chunks)
+
+    def _stream_generate(self, prompt: str) -> Iterator[str]:
+        """Yield Gemini response chunks as they arrive, caching the complete response
+
+        Shares _inflight with _cached_generate: a caller that finds the same prompt
+        already in progress waits for it and yields the complete response at once.
+        """
+        key = self._prompt_key(prompt)
+        
+        with self._resp_lock:
+            text = self._resp_cache.get(key)
+            if text is None:
+                future = self._inflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._inflight[key] = Future()
+        if text is not None:
+            yield text
+            return
+        if not owner:
+            text = future.result()
+            if text:
+                yield text
+            return
+        
+        parts = []
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            future.set_result(self._store_response(key, ''.join(parts)))
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            # A consumer that stops early leaves waiters with no reply, so they fall back
+            if not future.done():
+                future.set_result("")
+            with self._resp_lock:
+                del self._inflight[key]
+
+    def _prompt_key(self, prompt: str) -> bytes:
+        """Response cache key for a prompt"""
+        return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).digest()
+
+    def _store_response(self, key: bytes, text: str) -> str:
+        """Cache a non-empty Gemini response and return it"""
+        if text:
+            with self._resp_lock:
+                self._resp_cache[key] = text
+        return text
+
+    def _prepare_case_overview(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare comprehensive case overview"""
+        # Case data, documents summary and recent analysis are independent reads
+        case_future = self._io_pool.submit(self._get_case_data, case_id)
+        documents_future = self._io_pool.submit(self.document_tool.get_case_documents_summary_with_count, case_id)
+        analysis_future = self._io_pool.submit(self._get_recent_case_analysis, case_id)
+        
+        case_data = case_future.result()
+        if not case_data:
+            return None, "", lambda: "I couldn't find this case. Please make sure you're in the correct case chat."
+        
+        (_, doc_count), recent_analysis = documents_future.result(), analysis_future.result()
+        
+        prompt = _CASE_OVERVIEW_PROMPT.format(
+            title=case_data.get('title', 'Untitled Case'),
+            case_type=case_data.get('type', 'General'),
+            status=case_data.get('status', 'Active'),
+            created=case_data.get('createdAt', 'Unknown'),
+            priority=case_data.get('priority', 'Medium'),
+            description=case_data.get('description', 'No description available'),
+            doc_count=doc_count,
+            recent_analysis=f"Recent Analysis: {recent_analysis}" if recent_analysis else "",
+        )
+        
+        return prompt, f"📋 **Case Overview: {case_data.get('title', 'Untitled Case')}**\n\n", lambda: self._create_basic_case_overview(case_data, doc_count)
+
+    def _prepare_document_summary(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare summary of case documents"""
+        # Get documents data
+        documents, doc_count = self.document_tool.get_case_documents_detailed_with_count(case_id)
+        
+        if not documents:
+            return None, "", lambda: "There are no documents in this case yet. Please upload documents to get a summary."
+        
+        prompt = _DOCUMENT_SUMMARY_PROMPT.format(message=message, documents=documents)
+        
+        return prompt, "📄 **Document Summary**\n\n", lambda: self._create_basic_document_summary(documents, doc_count)
+
+    def _prepare_status_update(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare current case status update"""
+        # Case data, recent activities and document counts are independent reads
+        case_future = self._io_pool.submit(self._get_case_data, case_id)
+        activities_future = self._io_pool.submit(self._get_recent_activities, case_id)
+        counts_future = self._io_pool.submit(self.document_tool.get_document_statistics, case_id)
+        
+        case_data = case_future.result()
+        if not case_data:
+            return None, "", lambda: "I couldn't access the case information for the status update."
+        
+        recent_activities, doc_counts = activities_future.result(), counts_future.result()
+        
+        prompt = _STATUS_UPDATE_PROMPT.format(
+            title=case_data.get('title', 'Untitled Case'),
+            status=case_data.get('status', 'Active'),
+            updated=case_data.get('updatedAt', 'Unknown'),
+            doc_counts=doc_counts,
+            activities=recent_activities,
+        )
+        
+        return prompt, f"📊 **Status Update - {case_data.get('title', 'Case')}**\n\n", lambda: self._create_basic_status_update(case_data, doc_counts)
+
+    def _prepare_key_issues(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare summary of key issues in the case"""
+        # Case data and document content are independent reads
+        case_future = self._io_pool.submit(self._get_case_data, case_id)
+        documents_future = self._io_pool.submit(self.document_tool.get_documents_for_analysis, case_id, limit=5000)
+        
+        case_data, documents_content = case_future.result(), documents_future.result()
+        
+        if not documents_content:
+            return None, "", lambda: "I need case documents to identify key issues. Please upload relevant documents first."
+        
+        prompt = _KEY_ISSUES_PROMPT.format(
+            title=case_data.get('title', 'Untitled Case'),
+            case_type=case_data.get('type', 'General'),
+            documents_content=self._compact_text(documents_content),
+        )
+        
+        return prompt, "🎯 **Key Issues Analysis**\n\n", lambda: "I've reviewed the available information. To provide a detailed key issues summary, I recommend having more specific case documents available for analysis."
+
+    def _prepare_progress_summary(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare case progress summary"""
+        # Case data and activities are independent reads
+        case_future = self._io_pool.submit(self._get_case_data, case_id)
+        activity_limit = self.ACTIVITY_LIMIT if self.model else self.FALLBACK_ACTIVITY_LIMIT
+        activities_future = self._io_pool.submit(self._get_case_activities, case_id, activity_limit)
+        
+        case_data, activities = case_future.result(), activities_future.result()
+        
+        created_date = case_data.get('createdAt', 'Unknown')
+        current_status = case_data.get('status', 'Active')
+        
+        prompt = _PROGRESS_SUMMARY_PROMPT.format(
+            title=case_data.get('title', 'Untitled Case'),
+            created=created_date,
+            status=current_status,
+            activities=activities,
+        )
+        
+        return prompt, "📈 **Progress Summary**\n\n", lambda: self._create_basic_progress_summary(case_data, activities)
+
+    def _prepare_conversation_summary(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare summary of conversation history"""
+        if not conversation_history:
+            return None, "", lambda: "No conversation to summarize yet. Start by asking me questions about your case!"
+        
+        # Format messages for analysis (last 10 messages)
+        conversation_text = ''.join(
+            f"{'User' if msg.get('type') == 'user' else 'Assistant'}: {msg.get('message', '')}\n"
+            for msg in conversation_history[-10:]
+        )
+        
+        prompt = _CONVERSATION_SUMMARY_PROMPT.format(conversation_text=conversation_text)
+        
+        return prompt, "💬 **Conversation Summary**\n\n", lambda: self._create_basic_conversation_summary(conversation_history)
+
+    def _prepare_general_summary(self, case_id: str, message: str, conversation_history: List[Dict] = None) -> SummaryRequest:
+        """Prepare general summary assistance"""
+        case_context = self.document_tool.get_case_context(case_id)
+        
+        prompt = _GENERAL_SUMMARY_PROMPT.format(message=message, case_context=case_context)
+        
+        return prompt, "", lambda: self._fallback_summary_guidance(message)
 
     # Helper methods
+    def _compact_text(self, text: str) -> str:
+        """Collapse runs of spaces and blank lines in extracted document text"""
+        text = _HORIZONTAL_SPACE_RE.sub(' ', text)
+        return _BLANK_LINES_RE.sub('\n\n', text)
+
     def _get_case_data(self, case_id: str) -> Optional[Dict[str, Any]]:
         """Get case data from Firestore"""
+        with self._case_lock:
+            case_data = self._case_cache.get(case_id)
+        if case_data is not None:
+            return case_data
+        
         try:
             case_ref = self.firestore_client.collection('cases').document(case_id)
             case_doc = case_ref.get()
-            return case_doc.to_dict() if case_doc.exists else None
+            if not case_doc.exists:
+                return None
+            
+            case_data = case_doc.to_dict()
+            with self._case_lock:
+                self._case_cache[case_id] = case_data
+            return case_data
         except Exception as e:
             logger.error(f"Error getting case data: {e}")
             return None
@@ -407,6 +576,7 @@ class SummaryAgent:
             analysis_query = self.firestore_client.collection('case_analysis')\
                 .where('caseId', '==', case_id)\
                 .order_by('analyzedAt', direction='DESCENDING')\
+                .select(['executiveSummary'])\
                 .limit(1)
             
             docs = analysis_query.get()
@@ -422,43 +592,45 @@ class SummaryAgent:
     def _get_recent_activities(self, case_id: str) -> str:
         """Get recent case activities"""
         try:
-            activities_query = self.firestore_client.collection('case_activities')\
-                .where('caseId', '==', case_id)\
-                .order_by('timestamp', direction='DESCENDING')\
-                .limit(5)
-            
-            activities = []
-            for doc in activities_query.get():
-                activity = doc.to_dict()
-                activities.append(f"- {activity.get('action', 'Unknown')} ({activity.get('timestamp', 'Unknown time')})")
-            
+            activities = self._get_activity_lines(case_id, 5)
             return '\n'.join(activities) if activities else "No recent activities recorded."
         except Exception as e:
             logger.error(f"Error getting activities: {e}")
             return "Activity information unavailable."
 
-    def _get_case_activities(self, case_id: str) -> str:
-        """Get all case activities"""
+    def _get_case_activities(self, case_id: str, limit: int = ACTIVITY_LIMIT) -> str:
+        """Get case activities, newest first"""
         try:
-            activities_query = self.firestore_client.collection('case_activities')\
-                .where('caseId', '==', case_id)\
-                .order_by('timestamp', direction='DESCENDING')\
-                .limit(20)
-            
-            activities = []
-            for doc in activities_query.get():
-                activity = doc.to_dict()
-                activities.append(f"- {activity.get('action', 'Unknown')} ({activity.get('timestamp', 'Unknown time')})")
-            
+            activities = self._get_activity_lines(case_id, limit)
             return '\n'.join(activities) if activities else "No activities recorded."
         except Exception as e:
             logger.error(f"Error getting case activities: {e}")
             return "Activity information unavailable."
 
-    def _create_basic_case_overview(self, case_data: Dict, documents_summary: str) -> str:
-        """Create basic case overview when AI is unavailable"""
-        doc_count = len(documents_summary.split('Document:')) - 1 if documents_summary else 0
+    def _get_activity_lines(self, case_id: str, limit: int) -> List[str]:
+        """Formatted activity lines, newest first, reusing a recent query with an equal or larger limit"""
+        with self._case_lock:
+            cached = self._activities_cache.get(case_id)
+        # A list shorter than its query limit already holds every activity
+        if cached is not None and (cached[0] >= limit or len(cached[1]) < cached[0]):
+            return cached[1][:limit]
+        
+        activities_query = self.firestore_client.collection('case_activities')\
+            .where('caseId', '==', case_id)\
+            .order_by('timestamp', direction='DESCENDING')\
+            .limit(limit)
+        
+        activities = []
+        for doc in activities_query.get():
+            activity = doc.to_dict()
+            activities.append(f"- {activity.get('action', 'Unknown')} ({activity.get('timestamp', 'Unknown time')})")
         
+        with self._case_lock:
+            self._activities_cache[case_id] = (limit, activities)
+        return activities
+
+    def _create_basic_case_overview(self, case_data: Dict, doc_count: int) -> str:
+        """Create basic case overview when AI is unavailable"""
         return f"""📋 **Case Overview: {case_data.get('title', 'Untitled Case')}**
 
 **📝 Basic Information:**
@@ -485,10 +657,8 @@ class SummaryAgent:
 - Review document completeness
 - Identify any missing information or evidence"""
 
-    def _create_basic_document_summary(self, documents: str) -> str:
+    def _create_basic_document_summary(self, documents: str, doc_count: int) -> str:
         """Create basic document summary when AI is unavailable"""
-        doc_count = documents.count('filename:')
-        
         return f"""📄 **Document Summary**
 
 **📊 Overview:**
@@ -565,15 +735,14 @@ Case is in active management phase with document collection and analysis underwa
 
     def _create_basic_conversation_summary(self, messages: List[Dict]) -> str:
         """Create basic conversation summary when AI is unavailable"""
-        user_messages = [msg for msg in messages if msg.get('type') == 'user']
-        ai_messages = [msg for msg in messages if msg.get('type') == 'ai']
+        type_counts = Counter(msg.get('type') for msg in messages)
         
         return f"""💬 **Conversation Summary**
 
 **📊 Overview:**
 - **Total Messages:** {len(messages)}
-- **User Questions:** {len(user_messages)}
-- **AI Responses:** {len(ai_messages)}
+- **User Questions:** {type_counts['user']}
+- **AI Responses:** {type_counts['ai']}
 
 **🗣️ Recent Topics:**
 Based on the conversation, you've been discussing case-related topics and getting assistance with legal matters.
@@ -0,0 +1,129 @@
+#/services/ai-agent-service/src/connection_registry.py
+import heapq
+import threading
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+
+class Connection:
+    """A connected Socket.IO client; slotted since one exists per open socket"""
+    __slots__ = ('connected_at', 'user_id', 'case_id', 'user_agent')
+
+    def __init__(self, connected_at: float, user_id: Optional[str], case_id: Optional[str], user_agent: str):
+        self.connected_at = connected_at
+        self.user_id = user_id
+        self.case_id = case_id
+        self.user_agent = user_agent
+
+class ActiveChat:
+    """A case with clients in its chat room; slotted like Connection"""
+    __slots__ = ('case_id', 'created_at', 'client_count', 'message_count', 'last_activity')
+
+    def __init__(self, case_id: str, created_at: float):
+        self.case_id = case_id
+        self.created_at = created_at
+        self.client_count = 0
+        self.message_count = 0
+        self.last_activity = created_at
+
+class ExpiringRegistry:
+    """Dict of records that expire `timeout` seconds after `time_of(record)`
+
+    Deadlines are kept in a heap, so expiring entries costs O(k log n) in the
+    number of expired or touched entries instead of a scan of every record.
+    Records may be updated in place (e.g. a chat's last_activity); the heap
+    is only corrected when an entry reaches its old deadline, so updates
+    themselves stay O(1).
+
+    With max_size, adding a key to a full registry first evicts the least
+    recently active record, so memory stays bounded even if expiry falls behind.
+    """
+
+    def __init__(self, time_of: Callable[[Any], float], timeout: float, max_size: Optional[int] = None):
+        self.time_of = time_of
+        self.timeout = timeout
+        self.max_size = max_size
+        self._records: Dict[str, Any] = {}
+        # (deadline, key); at most one entry per key, tracked in _scheduled
+        self._deadlines: List[Tuple[float, str]] = []
+        self._scheduled: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __getitem__(self, key: str) -> Any:
+        return self._records[key]
+
+    def __setitem__(self, key: str, record: Any):
+        with self._lock:
+            if self.max_size is not None and key not in self._records and len(self._records) >= self.max_size:
+                self._evict_oldest()
+            self._records[key] = record
+            if key not in self._scheduled:
+                self._scheduled.add(key)
+                heapq.heappush(self._deadlines, (self.time_of(record) + self.timeout, key))
+
+    def __delitem__(self, key: str):
+        # The heap entry is dropped lazily when it comes due
+        with self._lock:
+            del self._records[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._records.get(key, default)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._records.pop(key, default)
+
+    def _evict_oldest(self):
+        # Caller holds the lock. Pops stale heap entries and re-arms touched ones
+        # until the earliest live deadline is found, then drops that record.
+        while self._deadlines:
+            scheduled, key = heapq.heappop(self._deadlines)
+            record = self._records.get(key)
+            if record is None:
+                self._scheduled.discard(key)
+                continue
+
+            deadline = self.time_of(record) + self.timeout
+            if deadline > scheduled:
+                heapq.heappush(self._deadlines, (deadline, key))
+                continue
+
+            del self._records[key]
+            self._scheduled.discard(key)
+            return
+
+    def due(self, now: float) -> bool:
+        """Whether expire(now) has entries left to process"""
+        deadlines = self._deadlines
+        return bool(deadlines) and deadlines[0][0] < now
+
+    def expire(self, now: float, limit: Optional[int] = None) -> List[str]:
+        """Remove and return the keys of records inactive for longer than timeout
+
+        With a limit, at most that many heap entries are processed per call so
+        callers can yield between batches; use due() to see if work remains.
+        """
+        expired = []
+        processed = 0
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] < now and (limit is None or processed < limit):
+                processed += 1
+                _, key = heapq.heappop(self._deadlines)
+                record = self._records.get(key)
+                if record is None:
+                    self._scheduled.discard(key)
+                    continue
+
+                deadline = self.time_of(record) + self.timeout
+                if deadline < now:
+                    del self._records[key]
+                    self._scheduled.discard(key)
+                    expired.append(key)
+                else:
+                    # Touched since it was scheduled; re-arm at the current deadline
+                    heapq.heappush(self._deadlines, (deadline, key))
+        return expired
@@ -0,0 +1,75 @@
+#/services/ai-agent-service/src/firestore_pool.py
+import itertools
+from typing import Callable, Iterator, List
+from google.cloud import firestore
+from google.cloud.firestore_v1.services.firestore import client as firestore_client
+from google.cloud.firestore_v1.services.firestore.transports import grpc as firestore_grpc_transport
+
+# Added to the keepalive the Firestore client already sets (30s pings while
+# calls are active): drop a dead connection after 20s without a ping ack, and
+# reconnect within seconds instead of gRPC's default backoff of up to 120s.
+# Idle pings stay off; Google front ends answer them with GOAWAY.
+CHANNEL_OPTIONS = {
+    "grpc.keepalive_timeout_ms": 20000,
+    "grpc.http2.max_pings_without_data": 0,
+    "grpc.initial_reconnect_backoff_ms": 1000,
+    "grpc.min_reconnect_backoff_ms": 1000,
+    "grpc.max_reconnect_backoff_ms": 10000,
+}
+
+class _FirestoreTransport(firestore_grpc_transport.FirestoreGrpcTransport):
+    """gRPC transport whose channels also get CHANNEL_OPTIONS"""
+
+    @classmethod
+    def create_channel(cls, host, credentials=None, options=(), **kwargs):
+        options = {**dict(options), **CHANNEL_OPTIONS}
+        return super().create_channel(host, credentials=credentials, options=options.items(), **kwargs)
+
+class FirestoreClient(firestore.Client):
+    """firestore.Client with tuned channel keepalive and reconnect options"""
+
+    @property
+    def _firestore_api(self):
+        return self._firestore_api_helper(
+            _FirestoreTransport,
+            firestore_client.FirestoreClient,
+            firestore_client,
+        )
+
+class FirestoreClientPool:
+    """Round-robin pool of Firestore clients, usable wherever a client is expected
+
+    Each client owns its own gRPC channel, so spreading calls across a few of
+    them lifts the per-connection HTTP/2 stream limit under concurrent load.
+    References, queries and batches stay bound to the client that created them.
+    """
+
+    def __init__(self, client_factory: Callable[[], firestore.Client], size: int):
+        self._clients: List[firestore.Client] = [client_factory() for _ in range(max(1, size))]
+        self._next = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __iter__(self) -> Iterator[firestore.Client]:
+        return iter(self._clients)
+
+    def client(self) -> firestore.Client:
+        """Next client in round-robin order"""
+        return self._clients[next(self._next) % len(self._clients)]
+
+    def collection(self, *path: str):
+        return self.client().collection(*path)
+
+    def document(self, *path: str):
+        return self.client().document(*path)
+
+    def batch(self):
+        return self.client().batch()
+
+    def get_all(self, references, *args, **kwargs):
+        return self.client().get_all(references, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Anything else (transactions, collection groups, ...) goes to the next client
+        return getattr(self.client(), name)
@@ -0,0 +1,37 @@
+#/services/ai-agent-service/src/json_codec.py
+from types import MappingProxyType
+from typing import Any, Union
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Datetimes go through Flask's default hook so HTTP dates keep their format
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+def orjson_default(obj: Any) -> Any:
+    """orjson fallback: read-only mappings (e.g. the agent catalog) as objects, the rest via Flask"""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    return DefaultJSONProvider.default(obj)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    default = staticmethod(orjson_default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = _OPTIONS | orjson.OPT_SORT_KEYS if self.sort_keys else _OPTIONS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+class SocketIOJSON:
+    """orjson with the dumps/loads interface python-socketio expects from its json module"""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=orjson_default, option=_OPTIONS).decode()
+
+    @staticmethod
+    def loads(s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
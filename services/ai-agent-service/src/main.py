@@ -1,43 +1,43 @@
 # services/ai-agent-service/src/main.py
-import eventlet
-eventlet.monkey_patch()
+from gevent import monkey
+monkey.patch_all()
 
+# Route gRPC (Firestore) I/O through the gevent hub instead of blocking it
+import grpc.experimental.gevent as grpc_gevent
+grpc_gevent.init_gevent()
 
 import os
-import json
+import functools
+import hashlib
 import logging
+import random
 import threading
 import time
-from flask import Flask, request, copy_current_request_context
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from flask import Flask, Response, request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from google.auth import default
-from google.cloud import firestore, storage
+from google.cloud import storage
 from google.api_core.client_options import ClientOptions
 from google.api_core.gapic_v1.client_info import ClientInfo
 from google.api_core.exceptions import GoogleAPICallError
 from dotenv import load_dotenv
 
-from orchestrator import AgentOrchestrator
-from websocket_handler import WebSocketHandler
+from agent_catalog import AVAILABLE_AGENTS
+from connection_registry import ActiveChat, Connection, ExpiringRegistry
+from firestore_pool import FirestoreClient, FirestoreClientPool
+from json_codec import OrjsonProvider, SocketIOJSON, orjson_default
 
 # ----------------------------
 # Load environment variables
 # ----------------------------
 load_dotenv()
 
-# ----------------------------
-# Initialize Google credentials early (avoid 300s delay)
-# ----------------------------
-try:
-    creds, project = default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
-    os.environ["GOOGLE_CLOUD_PROJECT"] = project or os.environ.get("GOOGLE_CLOUD_PROJECT", "")
-    logging.info(f"✅ Google credentials initialized for project: {project}")
-except Exception as e:
-    logging.warning(f"⚠️ Could not initialize default credentials: {e}")
-
-# Configure logging
+# Configure logging (LOG_LEVEL=WARNING in production drops the per-event info lines)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -51,6 +51,11 @@ else:
 # Initialize Flask app with Socket.IO
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'legal-ai-secret-key')
+app.json = OrjsonProvider(app)
+
+# Redis URL for fanning Socket.IO emits out across instances (e.g. redis://10.0.0.3:6379).
+# Required once more than one instance serves a case room; unset keeps emits in-process.
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
 
 # Initialize Socket.IO with CORS support
 socketio = SocketIO(
@@ -58,41 +63,112 @@ socketio = SocketIO(
     cors_allowed_origins="*",
     ping_timeout=180,
     ping_interval=20,
-    async_mode="eventlet",
-    max_http_buffer_size=10_000_000
+    async_mode="gevent",
+    # WebSocket only: no long-polling fallback buffers or upgrade round-trips.
+    # Clients must connect with io(url, { transports: ['websocket'] }).
+    transports=['websocket'],
+    max_http_buffer_size=1_000_000,
+    json=SocketIOJSON,
+    message_queue=SOCKETIO_MESSAGE_QUEUE,
+    channel='legal-ai'
 )
 
 # Initialize services
 try:
     firestore_client = None
     storage_client = None
+    # Guard lazy client creation so concurrent callers never build a second set of channels
+    _firestore_lock = threading.Lock()
+    _storage_lock = threading.Lock()
+
+    @functools.lru_cache(maxsize=1)
+    def init_google_credentials():
+        """Resolve default credentials and project once, before the first client is built (avoids a 300s delay)"""
+        try:
+            creds, project = default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+            os.environ["GOOGLE_CLOUD_PROJECT"] = project or os.environ.get("GOOGLE_CLOUD_PROJECT", "")
+            logger.info(f"✅ Google credentials initialized for project: {project}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not initialize default credentials: {e}")
+
+    def create_firestore_client():
+        return FirestoreClient(
+            client_options=ClientOptions(api_endpoint="firestore.googleapis.com"),
+            client_info=ClientInfo(user_agent="legal-ai/ai-agent-service")
+        )
+
     def get_firestore_client():
         global firestore_client
-        if firestore_client is None:
-         try:
-            firestore_client = firestore.Client(
-                client_options=ClientOptions(api_endpoint="firestore.googleapis.com"),
-                client_info=ClientInfo(user_agent="legal-ai/ai-agent-service")
-            )
-            logger.info("✅ Firestore client initialized successfully")
-         except GoogleAPICallError as e:
-            logger.error(f"❌ Firestore initialization failed: {e}")
-        return firestore_client
+        if firestore_client is not None:
+            return firestore_client
+        with _firestore_lock:
+            if firestore_client is None:
+                try:
+                    # Several clients (one gRPC channel each) so concurrent reads don't queue on one connection
+                    pool_size = int(os.environ.get('FIRESTORE_POOL_SIZE', 4))
+                    firestore_client = FirestoreClientPool(create_firestore_client, pool_size)
+                    logger.info(f"✅ Firestore client pool initialized successfully ({len(firestore_client)} clients)")
+                except GoogleAPICallError as e:
+                    logger.error(f"❌ Firestore initialization failed: {e}")
+            return firestore_client
 
     def get_storage_client():
         global storage_client
-        if storage_client is None:
-          try:
-            storage_client = storage.Client()
-            logger.info("✅ Storage client initialized successfully")
-          except GoogleAPICallError as e:
-            logger.error(f"❌ Storage initialization failed: {e}")  
-        return storage_client
-
-    orchestrator = AgentOrchestrator(get_firestore_client(), get_storage_client()) 
-    websocket_handler = WebSocketHandler(orchestrator, get_firestore_client())
+        if storage_client is not None:
+            return storage_client
+        with _storage_lock:
+            if storage_client is None:
+                try:
+                    storage_client = storage.Client()
+                    logger.info("✅ Storage client initialized successfully")
+                except GoogleAPICallError as e:
+                    logger.error(f"❌ Storage initialization failed: {e}")
+            return storage_client
+
+    # Agents and the chat handler are imported and built on first use, so cold starts
+    # (and the health probes) don't wait on Gemini, Firestore and Storage initialization
+    orchestrator = None
+    websocket_handler = None
+    _services_lock = threading.Lock()
+
+    def get_orchestrator():
+        global orchestrator
+        if orchestrator is not None:
+            return orchestrator
+        with _services_lock:
+            if orchestrator is None:
+                # Imported here: the agent modules are only needed once a client talks to them
+                from orchestrator import AgentOrchestrator
+                init_google_credentials()
+                # Both clients resolve credentials and open connections; overlap them
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    firestore_future = executor.submit(get_firestore_client)
+                    storage_future = executor.submit(get_storage_client)
+                    clients = firestore_future.result(), storage_future.result()
+                orchestrator = AgentOrchestrator(*clients)
+                logger.info("✅ Agent orchestrator initialized successfully")
+            return orchestrator
+
+    def get_websocket_handler():
+        global websocket_handler
+        if websocket_handler is not None:
+            return websocket_handler
+        handler_orchestrator = get_orchestrator()
+        with _services_lock:
+            if websocket_handler is None:
+                from websocket_handler import WebSocketHandler
+                # With a message queue other instances save to the same cases, so
+                # this one can't keep its cached chat history current
+                websocket_handler = WebSocketHandler(
+                    handler_orchestrator, get_firestore_client(),
+                    cache_history=SOCKETIO_MESSAGE_QUEUE is None
+                )
+            return websocket_handler
     
-    logger.info("✅ All services initialized successfully")
+    # The agent list only changes on deploy; sent on every connect and /agents request
+    _AGENTS_JSON = orjson.dumps(AVAILABLE_AGENTS, default=orjson_default)
+    _AGENTS_PREFIX = b'{"success":true,"agents":' + _AGENTS_JSON + b',"timestamp":'
+    _AGENTS_ETAG = hashlib.blake2b(_AGENTS_JSON, digest_size=8).hexdigest()
 except Exception as e:
     logger.error(f"❌ Failed to initialize services: {e}")
     raise
@@ -101,32 +177,44 @@ except Exception as e:
 PROJECT_ID = os.environ.get('GOOGLE_CLOUD_PROJECT')
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
 
-# Active connections tracking
-active_connections = {}
-active_chats = {}
+# Active connections tracking; entries expire after an hour without activity.
+# connected_at/last_activity are time.monotonic() values so clock jumps can't
+# expire (or keep alive) entries; payload timestamps stay wall-clock.
+#
+# Concurrency: handlers and background tasks are greenlets that only switch on
+# I/O. Every read-modify-write of a record (client_count, message_count,
+# last_activity) is done with no emit or Firestore call in between, so it
+# needs no lock; keep it that way when editing handlers. ExpiringRegistry's
+# own lock covers its heap when the cleanup task expires in batches.
+INACTIVITY_TIMEOUT = 3600  # seconds
+# Hard caps so a stalled cleanup task can't grow them without bound; the least
+# recently active entry is evicted first
+MAX_ACTIVE_CONNECTIONS = 50_000
+MAX_ACTIVE_CHATS = 10_000
+active_connections = ExpiringRegistry(lambda conn: conn.connected_at, INACTIVITY_TIMEOUT, MAX_ACTIVE_CONNECTIONS)
+active_chats = ExpiringRegistry(lambda chat: chat.last_activity, INACTIVITY_TIMEOUT, MAX_ACTIVE_CHATS)
+
+@functools.lru_cache(maxsize=4096)
+def case_room(case_id: str) -> str:
+    """Socket.IO room name for a case; cached so handlers share one string per case"""
+    return f"case_{case_id}"
+
+# Probe responses are polled frequently; only the dynamic fields are encoded per request
+_HEALTH_PREFIX = b'{"status":"healthy","service":"ai-agent-service","version":"1.0.0","timestamp":'
+_READY_PREFIX = b'{"status":"ready","timestamp":'
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return {
-        'status': 'healthy',
-        'service': 'ai-agent-service',
-        'version': '1.0.0',
-        'timestamp': time.time(),
-        'active_connections': len(active_connections),
-        'active_chats': len(active_chats)
-    }
+    body = f'{time.time()},"active_connections":{len(active_connections)},"active_chats":{len(active_chats)}}}'
+    return Response(_HEALTH_PREFIX + body.encode(), mimetype='application/json')
 
 @app.route('/ready', methods=['GET'])
 def readiness_check():
     """Lightweight readiness check for Cloud Run"""
     try:
         # Minimal test — don't call Firestore to avoid cold-start blocking
-        status = {
-            'status': 'ready',
-            'timestamp': time.time()
-        }
-        return status, 200
+        return Response(_READY_PREFIX + f'{time.time()}}}'.encode(), status=200, mimetype='application/json')
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
         return {'status': 'not_ready', 'error': str(e)}, 503
@@ -135,12 +223,14 @@ def readiness_check():
 def get_available_agents():
     """Get list of available AI agents"""
     try:
-        agents = orchestrator.get_available_agents()
-        return {
-            'success': True,
-            'agents': agents,
-            'timestamp': time.time()
-        }
+        # Clients holding the current list get an empty 304
+        if _AGENTS_ETAG in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(_AGENTS_PREFIX + f'{time.time()}}}'.encode(), mimetype='application/json')
+        response.set_etag(_AGENTS_ETAG)
+        response.cache_control.max_age = 60
+        return response
     except Exception as e:
         logger.error(f"Error getting agents: {e}")
         return {
@@ -149,11 +239,24 @@ def get_available_agents():
             'timestamp': time.time()
         }, 500
 
+# Health probes arrive every few seconds and would drown out real requests
+_UNLOGGED_PATHS = frozenset(('/health', '/ready'))
+# Fraction of other requests logged, e.g. 0.01 under heavy traffic
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 1.0))
+
 @app.before_request
 def log_request_info():
-    logger.info(f"📨 Incoming: {request.method} {request.path} from {request.remote_addr}")
+    if not logger.isEnabledFor(logging.INFO) or request.path in _UNLOGGED_PATHS:
+        return
+    if REQUEST_LOG_SAMPLE_RATE < 1.0 and random.random() >= REQUEST_LOG_SAMPLE_RATE:
+        return
+    logger.info("📨 Incoming: %s %s from %s", request.method, request.path, request.remote_addr)
 
 # WebSocket Events
+
+# Static part of the welcome message sent on every connect
+_CONNECTED_BASE = {'status': 'connected', 'available_agents': AVAILABLE_AGENTS}
+
 @socketio.on('connect')
 def handle_connect(auth=None):
     """Handle client connection"""
@@ -161,28 +264,27 @@ def handle_connect(auth=None):
         client_id = request.sid
         user_data = auth or {}
         
-        logger.info(f"🔌 Client connected: {client_id}")
+        logger.info("🔌 Client connected: %s", client_id)
         
         # Store connection info
-        active_connections[client_id] = {
-            'connected_at': time.time(),
-            'user_id': user_data.get('userId'),
-            'case_id': user_data.get('caseId'),
-            'user_agent': request.headers.get('User-Agent', 'Unknown')
-        }
+        active_connections[client_id] = Connection(
+            connected_at=time.monotonic(),
+            user_id=user_data.get('userId'),
+            case_id=user_data.get('caseId'),
+            user_agent=request.headers.get('User-Agent', 'Unknown')
+        )
         
         # Send welcome message
         emit('connected', {
-            'status': 'connected',
+            **_CONNECTED_BASE,
             'client_id': client_id,
-            'timestamp': time.time(),
-            'available_agents': orchestrator.get_available_agents()
+            'timestamp': time.time()
         })
         
-        logger.info(f"✅ Client {client_id} connected successfully")
+        logger.debug("✅ Client %s connected successfully", client_id)
         
     except Exception as e:
-        logger.error(f"❌ Connection error: {e}")
+        logger.error("❌ Connection error: %s", e)
         emit('error', {'error': 'Connection failed', 'details': str(e)})
 
 @socketio.on('disconnect')
@@ -190,27 +292,27 @@ def handle_disconnect():
     """Handle client disconnection"""
     try:
         client_id = request.sid
-        logger.info(f"🔌 Client disconnected: {client_id}")
+        logger.info("🔌 Client disconnected: %s", client_id)
         
         # Clean up connection data
         if client_id in active_connections:
-            connection_data = active_connections.pop(client_id)
-            case_id = connection_data.get('case_id')
+            connection = active_connections.pop(client_id)
+            case_id = connection.case_id
             
             # Leave case room if in one
             if case_id:
-                leave_room(f"case_{case_id}")
+                leave_room(case_room(case_id))
                 
                 # Clean up active chat if it was the last client
                 if case_id in active_chats:
-                    active_chats[case_id]['client_count'] -= 1
-                    if active_chats[case_id]['client_count'] <= 0:
+                    active_chats[case_id].client_count -= 1
+                    if active_chats[case_id].client_count <= 0:
                         del active_chats[case_id]
         
-        logger.info(f"✅ Client {client_id} cleanup completed")
+        logger.debug("✅ Client %s cleanup completed", client_id)
         
     except Exception as e:
-        logger.error(f"❌ Disconnect error: {e}")
+        logger.error("❌ Disconnect error: %s", e)
 
 @socketio.on('join_case')
 def handle_join_case(data):
@@ -225,49 +327,46 @@ def handle_join_case(data):
             return
         
         # Verify user has access to case
-        if not websocket_handler.verify_case_access(case_id, user_id):
+        if not get_websocket_handler().verify_case_access(case_id, user_id):
             emit('error', {'error': 'Access denied to case'})
             return
         
         # Join case room
-        join_room(f"case_{case_id}")
+        join_room(case_room(case_id))
         
         # Update connection info
         if client_id in active_connections:
-            active_connections[client_id]['case_id'] = case_id
-            active_connections[client_id]['user_id'] = user_id
+            connection = active_connections[client_id]
+            connection.case_id = case_id
+            connection.user_id = user_id
         
         # Initialize or update active chat
+        activity_time = time.monotonic()
         if case_id not in active_chats:
-            active_chats[case_id] = {
-                'case_id': case_id,
-                'created_at': time.time(),
-                'client_count': 0,
-                'message_count': 0,
-                'last_activity': time.time()
-            }
+            active_chats[case_id] = ActiveChat(case_id, activity_time)
         
-        active_chats[case_id]['client_count'] += 1
-        active_chats[case_id]['last_activity'] = time.time()
+        active_chats[case_id].client_count += 1
+        active_chats[case_id].last_activity = activity_time
         
         # Send case info and chat history
-        case_info = websocket_handler.get_case_info(case_id)
-        chat_history = websocket_handler.get_chat_history(case_id, limit=20)
+        case_info = get_websocket_handler().get_case_info(case_id)
+        chat_history = get_websocket_handler().get_chat_history(case_id, limit=20)
         
+        now = time.time()
         emit('case_joined', {
             'caseId': case_id,
             'caseInfo': case_info,
             'chatHistory': chat_history,
-            'timestamp': time.time()
+            'timestamp': now
         })
         
         # Notify other clients in the room
         emit('user_joined', {
             'userId': user_id,
-            'timestamp': time.time()
-        }, room=f"case_{case_id}", include_self=False)
+            'timestamp': now
+        }, room=case_room(case_id), include_self=False)
         
-        logger.info(f"✅ Client {client_id} joined case {case_id}")
+        logger.info("✅ Client %s joined case %s", client_id, case_id)
         
     except Exception as e:
         logger.error(f"❌ Join case error: {e}")
@@ -280,34 +379,147 @@ def handle_leave_case(data):
         client_id = request.sid
         case_id = data.get('caseId')
         user_id = data.get('userId')
+        now = time.time()
         
         if case_id:
-            leave_room(f"case_{case_id}")
+            leave_room(case_room(case_id))
             
             # Update active chat
             if case_id in active_chats:
-                active_chats[case_id]['client_count'] -= 1
-                if active_chats[case_id]['client_count'] <= 0:
+                active_chats[case_id].client_count -= 1
+                if active_chats[case_id].client_count <= 0:
                     del active_chats[case_id]
             
             # Notify other clients
             emit('user_left', {
                 'userId': user_id,
-                'timestamp': time.time()
-            }, room=f"case_{case_id}")
+                'timestamp': now
+            }, room=case_room(case_id))
+        
+        # Access is re-checked from Firestore if the user joins again
+        if case_id and user_id and websocket_handler is not None:
+            websocket_handler.invalidate_case_access(case_id, user_id)
         
         # Update connection info
         if client_id in active_connections:
-            active_connections[client_id]['case_id'] = None
+            active_connections[client_id].case_id = None
         
-        emit('case_left', {'caseId': case_id, 'timestamp': time.time()})
+        emit('case_left', {'caseId': case_id, 'timestamp': now})
         
-        logger.info(f"✅ Client {client_id} left case {case_id}")
+        logger.info("✅ Client %s left case %s", client_id, case_id)
         
     except Exception as e:
         logger.error(f"❌ Leave case error: {e}")
         emit('error', {'error': 'Failed to leave case', 'details': str(e)})
 
+def process_ai_response(case_id: str, user_id: str, message: str):
+    """Generate, save and broadcast the AI reply to a chat message; runs as a background task"""
+    room = case_room(case_id)
+    stream_id = uuid.uuid4().hex
+    try:
+        # Indicate that AI is thinking
+        socketio.emit('ai_thinking', {
+            'caseId': case_id,
+            'timestamp': time.time()
+        }, room=room)
+        
+        # Stream the AI response from the orchestrator as it is generated; clients
+        # append message_delta chunks and replace them with the final message_received
+        start_time = time.time()
+        agent_type, chunks = get_orchestrator().stream_message(
+            case_id=case_id,
+            user_id=user_id,
+            message=message,
+            conversation_history=get_websocket_handler().get_chat_history(case_id, limit=10)
+        )
+        
+        # Each chunk is sent once the next one arrives; the last one only goes out
+        # inside message_received, so single-chunk replies add no extra frame
+        parts = []
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if parts:
+                socketio.emit('message_delta', {
+                    'caseId': case_id,
+                    'streamId': stream_id,
+                    'chunk': parts[-1]
+                }, room=room)
+            parts.append(chunk)
+        
+        response = ''.join(parts)
+        ai_response = get_orchestrator().build_result(response, agent_type, start_time) if response else None
+        
+        if ai_response:
+            # Save AI message
+            ai_message_id = get_websocket_handler().save_message(
+                case_id=case_id,
+                user_id='ai_agent',
+                message=ai_response['response'],
+                message_type='ai',
+                metadata={
+                    'agent': ai_response.get('agent', 'general'),
+                    'confidence': ai_response.get('confidence', 0.0),
+                    'processing_time': ai_response.get('processing_time', 0.0)
+                }
+            )
+            
+            # Broadcast AI response
+            ai_message_data = {
+                'id': ai_message_id,
+                'caseId': case_id,
+                'userId': 'ai_agent',
+                'message': ai_response['response'],
+                'type': 'ai',
+                'agent': ai_response.get('agent', 'general'),
+                'confidence': ai_response.get('confidence', 0.0),
+                'timestamp': time.time(),
+                'streamId': stream_id,
+                'thinkingComplete': True
+            }
+            
+            # One frame per client: the reply also ends the thinking indicator
+            socketio.emit('message_received', ai_message_data, room=room)
+            
+            # Update active chat
+            if case_id in active_chats:
+                active_chats[case_id].message_count += 1
+                active_chats[case_id].last_activity = time.monotonic()
+        
+        else:
+            # Send error message if AI failed
+            error_message_data = {
+                'id': f"error_{int(time.time())}",
+                'caseId': case_id,
+                'userId': 'ai_agent',
+                'message': 'I apologize, but I encountered an error processing your request. Please try again.',
+                'type': 'ai',
+                'agent': 'error',
+                'timestamp': time.time(),
+                'thinkingComplete': True
+            }
+            
+            socketio.emit('message_received', error_message_data, room=room)
+        
+    except Exception as e:
+        logger.error(f"❌ AI processing error: {e}")
+        
+        # Send error message; the partial reply is never saved, and the streamId
+        # tells clients to replace any message_delta chunks already shown
+        error_message_data = {
+            'id': f"error_{int(time.time())}",
+            'caseId': case_id,
+            'userId': 'ai_agent',
+            'message': 'I apologize, but I encountered a technical error. Please try again later.',
+            'type': 'ai',
+            'agent': 'error',
+            'timestamp': time.time(),
+            'streamId': stream_id,
+            'thinkingComplete': True
+        }
+        
+        socketio.emit('message_received', error_message_data, room=room)
+
 @socketio.on('send_message')
 def handle_send_message(data):
     """Handle incoming chat message"""
@@ -327,14 +539,14 @@ def handle_send_message(data):
             return
         
         # Verify access
-        if not websocket_handler.verify_case_access(case_id, user_id):
+        if not get_websocket_handler().verify_case_access(case_id, user_id):
             emit('error', {'error': 'Access denied'})
             return
         
-        logger.info(f"💬 Processing message from user {user_id} in case {case_id}")
+        logger.info("💬 Processing message from user %s in case %s", user_id, case_id)
         
         # Save user message
-        user_message_id = websocket_handler.save_message(
+        user_message_id = get_websocket_handler().save_message(
             case_id=case_id,
             user_id=user_id,
             message=message,
@@ -352,109 +564,19 @@ def handle_send_message(data):
             'timestamp': time.time()
         }
         
-        emit('message_received', user_message_data, room=f"case_{case_id}")
+        emit('message_received', user_message_data, room=case_room(case_id))
         
         # Update active chat
         if case_id in active_chats:
-            active_chats[case_id]['message_count'] += 1
-            active_chats[case_id]['last_activity'] = time.time()
-        
-        # Process message with AI agents (async)
-        @copy_current_request_context
-        def process_ai_response():
-            try:
-                # Indicate that AI is thinking
-                emit('ai_thinking', {
-                    'caseId': case_id,
-                    'timestamp': time.time()
-                }, room=f"case_{case_id}")
-                
-                # Get AI response from orchestrator
-                ai_response = orchestrator.process_message(
-                    case_id=case_id,
-                    user_id=user_id,
-                    message=message,
-                    conversation_history=websocket_handler.get_chat_history(case_id, limit=10)
-                )
-                
-                if ai_response:
-                    # Save AI message
-                    ai_message_id = websocket_handler.save_message(
-                        case_id=case_id,
-                        user_id='ai_agent',
-                        message=ai_response['response'],
-                        message_type='ai',
-                        metadata={
-                            'agent': ai_response.get('agent', 'general'),
-                            'confidence': ai_response.get('confidence', 0.0),
-                            'processing_time': ai_response.get('processing_time', 0.0)
-                        }
-                    )
-                    
-                    # Broadcast AI response
-                    ai_message_data = {
-                        'id': ai_message_id,
-                        'caseId': case_id,
-                        'userId': 'ai_agent',
-                        'message': ai_response['response'],
-                        'type': 'ai',
-                        'agent': ai_response.get('agent', 'general'),
-                        'confidence': ai_response.get('confidence', 0.0),
-                        'timestamp': time.time()
-                    }
-                    
-                    socketio.emit('message_received', ai_message_data, room=f"case_{case_id}")
-                    
-                    # Update active chat
-                    if case_id in active_chats:
-                        active_chats[case_id]['message_count'] += 1
-                        active_chats[case_id]['last_activity'] = time.time()
-                
-                else:
-                    # Send error message if AI failed
-                    error_message_data = {
-                        'id': f"error_{int(time.time())}",
-                        'caseId': case_id,
-                        'userId': 'ai_agent',
-                        'message': 'I apologize, but I encountered an error processing your request. Please try again.',
-                        'type': 'ai',
-                        'agent': 'error',
-                        'timestamp': time.time()
-                    }
-                    
-                    socketio.emit('message_received', error_message_data, room=f"case_{case_id}")
-                
-                # Stop thinking indicator
-                socketio.emit('ai_thinking_stop', {
-                    'caseId': case_id,
-                    'timestamp': time.time()
-                }, room=f"case_{case_id}")
-                
-            except Exception as e:
-                logger.error(f"❌ AI processing error: {e}")
-                
-                # Send error message
-                error_message_data = {
-                    'id': f"error_{int(time.time())}",
-                    'caseId': case_id,
-                    'userId': 'ai_agent',
-                    'message': 'I apologize, but I encountered a technical error. Please try again later.',
-                    'type': 'ai',
-                    'agent': 'error',
-                    'timestamp': time.time()
-                }
-                
-                socketio.emit('message_received', error_message_data, room=f"case_{case_id}")
-                socketio.emit('ai_thinking_stop', {
-                    'caseId': case_id,
-                    'timestamp': time.time()
-                }, room=f"case_{case_id}")
+            active_chats[case_id].message_count += 1
+            active_chats[case_id].last_activity = time.monotonic()
         
-        # Start AI processing in background thread
-        socketio.start_background_task(process_ai_response)
+        # Start AI processing in background thread; only the message fields go along,
+        # the handler's request context isn't needed there
+        socketio.start_background_task(process_ai_response, case_id, user_id, message)
 
         
-        logger.info(f"✅ Message processed for case {case_id}")
+        logger.info("✅ Message processed for case %s", case_id)
         
     except Exception as e:
         logger.error(f"❌ Send message error: {e}")
@@ -469,11 +591,11 @@ def handle_get_chat_history(data):
         limit = min(data.get('limit', 50), 100)  # Max 100 messages
         offset = data.get('offset', 0)
         
-        if not websocket_handler.verify_case_access(case_id, user_id):
+        if not get_websocket_handler().verify_case_access(case_id, user_id):
             emit('error', {'error': 'Access denied'})
             return
         
-        chat_history = websocket_handler.get_chat_history(case_id, limit=limit, offset=offset)
+        chat_history = get_websocket_handler().get_chat_history(case_id, limit=limit, offset=offset)
         
         emit('chat_history', {
             'caseId': case_id,
@@ -494,12 +616,12 @@ def handle_clear_chat_history(data):
         case_id = data.get('caseId')
         user_id = data.get('userId')
         
-        if not websocket_handler.verify_case_access(case_id, user_id):
+        if not get_websocket_handler().verify_case_access(case_id, user_id):
             emit('error', {'error': 'Access denied'})
             return
         
         # Clear chat history
-        cleared_count = websocket_handler.clear_chat_history(case_id, user_id)
+        cleared_count = get_websocket_handler().clear_chat_history(case_id, user_id)
         
         # Notify all clients in the room
         emit('chat_history_cleared', {
@@ -507,9 +629,9 @@ def handle_clear_chat_history(data):
             'clearedBy': user_id,
             'messageCount': cleared_count,
             'timestamp': time.time()
-        }, room=f"case_{case_id}")
+        }, room=case_room(case_id))
         
-        logger.info(f"✅ Chat history cleared for case {case_id} by user {user_id}")
+        logger.info("✅ Chat history cleared for case %s by user %s", case_id, user_id)
         
     except Exception as e:
         logger.error(f"❌ Clear chat history error: {e}")
@@ -527,7 +649,7 @@ def handle_typing_start(data):
             'caseId': case_id,
             'userId': user_id,
             'timestamp': time.time()
-        }, room=f"case_{case_id}", include_self=False)
+        }, room=case_room(case_id), include_self=False)
         
     except Exception as e:
         logger.error(f"❌ Typing start error: {e}")
@@ -544,60 +666,85 @@ def handle_typing_stop(data):
             'caseId': case_id,
             'userId': user_id,
             'timestamp': time.time()
-        }, room=f"case_{case_id}", include_self=False)
+        }, room=case_room(case_id), include_self=False)
         
     except Exception as e:
         logger.error(f"❌ Typing stop error: {e}")
 
 # Background task to clean up inactive connections
+CLEANUP_BATCH_SIZE = 1024
+
+def _expire_in_batches(registry: ExpiringRegistry, now: float) -> list:
+    """Expire registry entries a batch at a time, yielding to socket I/O in between"""
+    expired = registry.expire(now, limit=CLEANUP_BATCH_SIZE)
+    while registry.due(now):
+        socketio.sleep(0)
+        expired.extend(registry.expire(now, limit=CLEANUP_BATCH_SIZE))
+    return expired
+
 def cleanup_inactive_connections():
     """Clean up inactive connections and chats"""
     while True:
         try:
-            current_time = time.time()
-            timeout = 3600  # 1 hour timeout
+            current_time = time.monotonic()
             
             # Clean up inactive connections
-            inactive_connections = []
-            for client_id, conn_data in active_connections.items():
-                if current_time - conn_data['connected_at'] > timeout:
-                    inactive_connections.append(client_id)
-            
-            for client_id in inactive_connections:
-                logger.info(f"🧹 Cleaning up inactive connection: {client_id}")
-                active_connections.pop(client_id, None)
+            inactive_connections = _expire_in_batches(active_connections, current_time)
             
             # Clean up inactive chats
-            inactive_chats = []
-            for case_id, chat_data in active_chats.items():
-                if current_time - chat_data['last_activity'] > timeout:
-                    inactive_chats.append(case_id)
+            inactive_chats = _expire_in_batches(active_chats, current_time)
             
-            for case_id in inactive_chats:
-                logger.info(f"🧹 Cleaning up inactive chat: {case_id}")
-                active_chats.pop(case_id, None)
+            # Per-entry lines only at debug level; a sweep can expire thousands
+            if logger.isEnabledFor(logging.DEBUG):
+                for client_id in inactive_connections:
+                    logger.debug("🧹 Cleaned up inactive connection: %s", client_id)
+                for case_id in inactive_chats:
+                    logger.debug("🧹 Cleaned up inactive chat: %s", case_id)
             
             if inactive_connections or inactive_chats:
-                logger.info(f"✅ Cleanup completed: {len(inactive_connections)} connections, {len(inactive_chats)} chats")
+                logger.info("✅ Cleanup completed: %d connections, %d chats", len(inactive_connections), len(inactive_chats))
             
             # Sleep for 5 minutes before next cleanup
-            time.sleep(300)
+            socketio.sleep(300)
             
         except Exception as e:
-            logger.error(f"❌ Cleanup error: {e}")
-            time.sleep(60)  # Wait 1 minute before retrying
+            logger.error("❌ Cleanup error: %s", e)
+            socketio.sleep(60)  # Wait 1 minute before retrying
+
+def warm_up_services():
+    """Build the agents and open every client's connection before the first user needs them
 
+    Runs right after startup, while Cloud Run's startup CPU boost is still active,
+    so the gRPC/TLS handshakes don't land on the first chat message.
+    """
+    try:
+        get_websocket_handler()
+        if firestore_client is not None:
+            # One trivial query per pooled client, since each owns its own channel
+            for client in firestore_client:
+                client.collection('_warmup').limit(1).get(timeout=2)
+        if storage_client is not None:
+            list(storage_client.list_buckets(max_results=1, timeout=2))
+        logger.info("🔥 Service warmup completed")
+    except Exception as e:
+        # A denied or slow warmup call still leaves the connection established
+        logger.warning(f"⚠️ Service warmup incomplete: {e}")
+
+# Runs as a greenlet, so it also starts when a WSGI server imports this module
+socketio.start_background_task(cleanup_inactive_connections)
 
+if os.environ.get('WARMUP', '1') == '1':
+    socketio.start_background_task(warm_up_services)
 
+
+# Production entrypoint (one worker: connection state is per process):
+#   gunicorn -k geventwebsocket.gunicorn.workers.GeventWebSocketWorker -w 1 \
+#       --worker-connections 4000 -b 0.0.0.0:$PORT --chdir src main:app
 if __name__ == '__main__':
     logger.info("🚀 Starting AI Agent Service")
     logger.info(f"📅 Started at: {time.ctime()}")
     logger.info(f"🌐 Project ID: {PROJECT_ID}")
     
-    # Start cleanup task in background
-    cleanup_thread = threading.Thread(target=cleanup_inactive_connections, daemon=True)
-    cleanup_thread.start()
-    
     # Start Socket.IO server
     port = int(os.environ.get('PORT', 8080))
     socketio.run(
@@ -1,15 +1,77 @@
 import logging
+import re
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Mapping, Optional, Tuple
 from agents.evidence_agent import EvidenceAgent
 from agents.summary_agent import SummaryAgent
 from agents.draft_agent import DraftAgent
 from agents.general_agent import GeneralAgent
 from tools.search_tool import SearchTool
 from tools.document_tool import DocumentTool
+from agent_catalog import AVAILABLE_AGENTS
 
 logger = logging.getLogger(__name__)
 
+# agent -> keywords; each one present in the message scores a point
+_AGENT_KEYWORDS = {
+    'evidence': frozenset([
+        'evidence', 'document', 'search', 'find', 'locate', 'extract',
+        'timeline', 'chronology', 'facts', 'witness', 'testimony',
+        'exhibits', 'proof', 'analysis', 'examine'
+    ]),
+    'summary': frozenset([
+        'summary', 'summarize', 'overview', 'status', 'progress',
+        'key points', 'main issues', 'brief', 'outline', 'recap'
+    ]),
+    'draft': frozenset([
+        'draft', 'write', 'compose', 'create', 'letter', 'document',
+        'motion', 'brief', 'contract', 'agreement', 'response',
+        'correspondence', 'memo', 'proposal'
+    ]),
+    'general': frozenset([
+        'advice', 'strategy', 'legal', 'law', 'case', 'court',
+        'judge', 'attorney', 'counsel', 'litigation', 'settlement',
+        'rights', 'liability', 'damages', 'jurisdiction'
+    ]),
+}
+
+# agent -> phrases; any of them present adds a bonus of 2
+_AGENT_PATTERNS = {
+    'general': frozenset(['what is', 'tell me about', 'explain']),
+    'evidence': frozenset(['find', 'search', 'look for']),
+    'summary': frozenset(['summarize', 'overview', 'status']),
+    'draft': frozenset(['write', 'draft', 'create']),
+}
+
+_AGENT_TERMS = set().union(*_AGENT_KEYWORDS.values(), *_AGENT_PATTERNS.values())
+
+# A lookahead match reports one term per offset (the longest, given the
+# ordering), so each term maps to every term that is a prefix of it and
+# therefore also occurs there
+_TERM_PREFIXES = {
+    term: frozenset(other for other in _AGENT_TERMS if term.startswith(other))
+    for term in _AGENT_TERMS
+}
+
+# One scan over the message finds every term occurrence; see
+# general_agent._ASSISTANCE_RE for the same technique
+_AGENT_TERMS_RE = re.compile('(?=({}))'.format('|'.join(
+    re.escape(term) for term in sorted(_AGENT_TERMS, key=lambda t: (-len(t), t))
+)))
+
+# Confidence adjustments applied to every routed response
+_AGENT_CONFIDENCE_BONUS = {
+    'evidence': 0.1,
+    'summary': 0.1,
+    'draft': 0.1,
+    'general': 0.05
+}
+
+_UNCERTAINTY_INDICATORS = (
+    'i\'m not sure', 'i don\'t know', 'unclear', 'uncertain',
+    'maybe', 'possibly', 'might be', 'could be'
+)
+
 class AgentOrchestrator:
     """Orchestrates multiple AI agents for legal case assistance"""
     
@@ -42,58 +104,9 @@ class AgentOrchestrator:
             logger.error(f"Agent test failed: {e}")
             raise
 
-    def get_available_agents(self) -> List[Dict[str, Any]]:
-        """Get list of available agents with their capabilities"""
-        return [
-            {
-                'id': 'evidence',
-                'name': 'Evidence Analyst',
-                'description': 'Analyzes and searches through case evidence and documents',
-                'icon': '🔍',
-                'capabilities': [
-                    'Document analysis',
-                    'Evidence search',
-                    'Fact extraction',
-                    'Timeline reconstruction'
-                ]
-            },
-            {
-                'id': 'summary',
-                'name': 'Case Summarizer',
-                'description': 'Provides comprehensive case summaries and overviews',
-                'icon': '📋',
-                'capabilities': [
-                    'Case summarization',
-                    'Key points extraction',
-                    'Status updates',
-                    'Progress tracking'
-                ]
-            },
-            {
-                'id': 'draft',
-                'name': 'Document Drafter',
-                'description': 'Helps draft legal documents and correspondence',
-                'icon': '📝',
-                'capabilities': [
-                    'Legal document drafting',
-                    'Letter writing',
-                    'Contract reviews',
-                    'Motion preparation'
-                ]
-            },
-            {
-                'id': 'general',
-                'name': 'Legal Assistant',
-                'description': 'General legal assistance and case guidance',
-                'icon': '⚖️',
-                'capabilities': [
-                    'Legal advice',
-                    'Case strategy',
-                    'Research assistance',
-                    'General guidance'
-                ]
-            }
-        ]
+    def get_available_agents(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get the read-only list of available agents with their capabilities"""
+        return AVAILABLE_AGENTS
 
     def process_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Optional[Dict[str, Any]]:
         """Process user message and route to appropriate agent"""
@@ -121,19 +134,8 @@ class AgentOrchestrator:
                 conversation_history=conversation_history or []
             )
             
-            processing_time = time.time() - start_time
-            
             if response:
-                result = {
-                    'response': response,
-                    'agent': selected_agent,
-                    'processing_time': processing_time,
-                    'confidence': self._calculate_confidence(response, selected_agent),
-                    'timestamp': time.time()
-                }
-                
-                logger.info(f"✅ Message processed by {selected_agent} in {processing_time:.2f}s")
-                return result
+                return self.build_result(response, selected_agent, start_time)
             
             return None
             
@@ -141,58 +143,54 @@ class AgentOrchestrator:
             logger.error(f"❌ Message processing error: {e}")
             return None
 
+    def stream_message(self, case_id: str, user_id: str, message: str, conversation_history: List[Dict] = None) -> Tuple[str, Iterator[str]]:
+        """Route a message like process_message, returning the agent and an iterator of response chunks
+
+        Agents without a stream_message produce their whole reply as one chunk.
+        Pass the joined chunks to build_result once the iterator is exhausted;
+        if it raises part way, the chunks so far are an incomplete reply.
+        """
+        logger.info(f"🤖 Streaming message for case {case_id}")
+        
+        selected_agent = self._select_agent(message, conversation_history)
+        if selected_agent not in self.agents:
+            selected_agent = 'general'
+        agent = self.agents[selected_agent]
+        logger.info(f"🎯 Selected agent: {selected_agent}")
+        
+        kwargs = dict(case_id=case_id, user_id=user_id, message=message, conversation_history=conversation_history or [])
+        if hasattr(agent, 'stream_message'):
+            return selected_agent, agent.stream_message(**kwargs)
+        
+        response = agent.process_message(**kwargs)
+        return selected_agent, iter([response] if response else [])
+
+    def build_result(self, response: str, agent_type: str, start_time: float) -> Dict[str, Any]:
+        """Response dict returned by process_message for a finished reply"""
+        processing_time = time.time() - start_time
+        logger.info(f"✅ Message processed by {agent_type} in {processing_time:.2f}s")
+        return {
+            'response': response,
+            'agent': agent_type,
+            'processing_time': processing_time,
+            'confidence': self._calculate_confidence(response, agent_type),
+            'timestamp': time.time()
+        }
+
     def _select_agent(self, message: str, conversation_history: List[Dict] = None) -> str:
         """Select the most appropriate agent for the message"""
         try:
-            message_lower = message.lower()
-            
-            # Evidence-related keywords
-            evidence_keywords = [
-                'evidence', 'document', 'search', 'find', 'locate', 'extract',
-                'timeline', 'chronology', 'facts', 'witness', 'testimony',
-                'exhibits', 'proof', 'analysis', 'examine'
-            ]
-            
-            # Summary-related keywords
-            summary_keywords = [
-                'summary', 'summarize', 'overview', 'status', 'progress',
-                'key points', 'main issues', 'brief', 'outline', 'recap'
-            ]
-            
-            # Draft-related keywords
-            draft_keywords = [
-                'draft', 'write', 'compose', 'create', 'letter', 'document',
-                'motion', 'brief', 'contract', 'agreement', 'response',
-                'correspondence', 'memo', 'proposal'
-            ]
-            
-            # General legal keywords
-            general_keywords = [
-                'advice', 'strategy', 'legal', 'law', 'case', 'court',
-                'judge', 'attorney', 'counsel', 'litigation', 'settlement',
-                'rights', 'liability', 'damages', 'jurisdiction'
-            ]
+            found = set()
+            for match in _AGENT_TERMS_RE.finditer(message.lower()):
+                found |= _TERM_PREFIXES[match.group(1)]
             
             # Count keyword matches for each agent
-            scores = {
-                'evidence': sum(1 for keyword in evidence_keywords if keyword in message_lower),
-                'summary': sum(1 for keyword in summary_keywords if keyword in message_lower),
-                'draft': sum(1 for keyword in draft_keywords if keyword in message_lower),
-                'general': sum(1 for keyword in general_keywords if keyword in message_lower)
-            }
+            scores = {agent: len(found & keywords) for agent, keywords in _AGENT_KEYWORDS.items()}
             
             # Check for specific patterns
-            if any(word in message_lower for word in ['what is', 'tell me about', 'explain']):
-                scores['general'] += 2
-            
-            if any(word in message_lower for word in ['find', 'search', 'look for']):
-                scores['evidence'] += 2
-            
-            if any(word in message_lower for word in ['summarize', 'overview', 'status']):
-                scores['summary'] += 2
-            
-            if any(word in message_lower for word in ['write', 'draft', 'create']):
-                scores['draft'] += 2
+            for agent, patterns in _AGENT_PATTERNS.items():
+                if not found.isdisjoint(patterns):
+                    scores[agent] += 2
             
             # Consider conversation context
             if conversation_history:
@@ -229,24 +227,12 @@ class AgentOrchestrator:
                 confidence += 0.1
             
             # Adjust based on agent specialization
-            agent_confidence_bonus = {
-                'evidence': 0.1,
-                'summary': 0.1,
-                'draft': 0.1,
-                'general': 0.05
-            }
-            
-            confidence += agent_confidence_bonus.get(agent_type, 0)
+            confidence += _AGENT_CONFIDENCE_BONUS.get(agent_type, 0)
             
             # Check for indicators of uncertainty
-            uncertainty_indicators = [
-                'i\'m not sure', 'i don\'t know', 'unclear', 'uncertain',
-                'maybe', 'possibly', 'might be', 'could be'
-            ]
-            
             if response:
                 response_lower = response.lower()
-                uncertainty_count = sum(1 for indicator in uncertainty_indicators if indicator in response_lower)
+                uncertainty_count = sum(1 for indicator in _UNCERTAINTY_INDICATORS if indicator in response_lower)
                 confidence -= uncertainty_count * 0.1
             
             return min(1.0, max(0.0, confidence))
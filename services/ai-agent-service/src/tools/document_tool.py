@@ -1,7 +1,7 @@
 #services/ai-agent-service/src/tools/document_tool.py
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from google.cloud import firestore
 
 logger = logging.getLogger(__name__)
@@ -48,6 +48,11 @@ Documents: {doc_summary}
 
     def get_case_documents_summary(self, case_id: str) -> str:
         """Get summary of all case documents"""
+        summary, _ = self.get_case_documents_summary_with_count(case_id)
+        return summary
+
+    def get_case_documents_summary_with_count(self, case_id: str) -> Tuple[str, int]:
+        """Get summary of all case documents along with the number of documents"""
         try:
             docs_query = self.firestore_client.collection('documents')\
                 .where('caseId', '==', case_id)\
@@ -57,7 +62,7 @@ Documents: {doc_summary}
             documents = docs_query.get()
             
             if not documents:
-                return "No documents uploaded yet."
+                return "No documents uploaded yet.", 0
             
             summary = f"{len(documents)} documents:\n"
             
@@ -71,14 +76,19 @@ Documents: {doc_summary}
                 size_mb = round(size / (1024 * 1024), 2) if size > 0 else 0
                 summary += f"- {filename} ({size_mb}MB, {extraction_status}, {upload_date})\n"
             
-            return summary.strip()
+            return summary.strip(), len(documents)
             
         except Exception as e:
             logger.error(f"❌ Error getting documents summary: {e}")
-            return "Document summary unavailable."
+            return "Document summary unavailable.", 0
 
     def get_case_documents_detailed(self, case_id: str) -> str:
         """Get detailed information about case documents"""
+        detailed_info, _ = self.get_case_documents_detailed_with_count(case_id)
+        return detailed_info
+
+    def get_case_documents_detailed_with_count(self, case_id: str) -> Tuple[str, int]:
+        """Get detailed information about case documents along with the number of documents"""
         try:
             docs_query = self.firestore_client.collection('documents')\
                 .where('caseId', '==', case_id)\
@@ -87,7 +97,7 @@ Documents: {doc_summary}
             documents = docs_query.get()
             
             if not documents:
-                return "No documents available for analysis."
+                return "No documents available for analysis.", 0
             
             detailed_info = ""
             
@@ -108,11 +118,11 @@ Text Preview: {extracted_text}
 
 """
             
-            return detailed_info.strip()
+            return detailed_info.strip(), len(documents)
             
         except Exception as e:
             logger.error(f"❌ Error getting detailed documents: {e}")
-            return "Detailed document information unavailable."
+            return "Detailed document information unavailable.", 0
 
     def get_documents_for_analysis(self, case_id: str, limit: int = 8000) -> str:
         """Get document contents for AI analysis"""
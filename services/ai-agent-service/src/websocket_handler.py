@@ -1,7 +1,10 @@
 #/services/ai-agent-service/src/websocket_handler.py
 import logging
+import threading
 import time
+from collections import deque
 from typing import Dict, Any, List, Optional
+from cachetools import TTLCache
 from google.cloud import firestore
 from google.api_core.exceptions import DeadlineExceeded, NotFound, GoogleAPICallError
 import datetime
@@ -21,9 +24,31 @@ logger = logging.getLogger(__name__)
 class WebSocketHandler:
     """Handles WebSocket-related operations for AI agent chat"""
     
-    def __init__(self, orchestrator, firestore_client):
+    HISTORY_CACHE_SIZE = 1024  # cases
+    HISTORY_CACHE_TTL = 300  # seconds
+    HISTORY_CACHE_MESSAGES = 20  # most recent messages kept per case
+    ACCESS_CACHE_SIZE = 4096
+    ACCESS_CACHE_TTL = 60  # seconds
+    
+    def __init__(self, orchestrator, firestore_client, cache_history: bool = True):
         self.orchestrator = orchestrator
         self.firestore_client = firestore_client
+        
+        # case_id -> deque of the latest messages, oldest first; appended to on save
+        # so each chat message doesn't re-query the history it was just added to.
+        # Only valid while this instance sees every save for its cases, so it is
+        # disabled when several instances share a case room.
+        self._cache_history = cache_history
+        self._history_cache = TTLCache(maxsize=self.HISTORY_CACHE_SIZE, ttl=self.HISTORY_CACHE_TTL)
+        # case_id -> token of the history query in flight; a save drops it so the
+        # query's now-outdated result is not cached over the appended message
+        self._history_fills: Dict[str, object] = {}
+        self._history_lock = threading.Lock()
+        
+        # (case_id, user_id) pairs with access; every chat event re-checks access,
+        # so granted access skips the case read for a minute
+        self._access_cache = TTLCache(maxsize=self.ACCESS_CACHE_SIZE, ttl=self.ACCESS_CACHE_TTL)
+        self._access_lock = threading.Lock()
         logger.info("✅ WebSocketHandler initialized")
 
     
@@ -36,26 +61,38 @@ class WebSocketHandler:
                 logger.warning("⚠️ Missing case_id or user_id in verify_case_access()")
                 return False
             
+            key = (case_id, user_id)
+            with self._access_lock:
+                cached = self._access_cache.get(key)
+            if cached is not None:
+                return cached
+            
             case_ref = self.firestore_client.collection('cases').document(case_id)
             case_doc = case_ref.get()
             
             if not case_doc.exists:
                 logger.warning(f"⚠️Case {case_id} not found")
-                return False
-            
-            case_data = case_doc.to_dict()
-            created_by = case_data.get('createdBy')
-            
-            # Check if user is the case owner
-            if created_by == user_id:
-                logger.info(f"✅ Verified access: user {user_id} owns case {case_id}")
-                return True
-            
-            # TODO: Add support for shared cases or team access
-            # For now, only case owner has access
-            
-            logger.warning(f"User {user_id} denied access to case {case_id}")
-            return False
+                allowed = False
+            else:
+                case_data = case_doc.to_dict()
+                created_by = case_data.get('createdBy')
+                
+                # Check if user is the case owner
+                # TODO: Add support for shared cases or team access
+                # For now, only case owner has access
+                allowed = created_by == user_id
+                if allowed:
+                    logger.info(f"✅ Verified access: user {user_id} owns case {case_id}")
+                else:
+                    logger.warning(f"User {user_id} denied access to case {case_id}")
+            
+            # Only granted access is cached: a user just added to a case, or a case
+            # created right before the first join, must not be refused for a minute.
+            # Errors below fall through uncached.
+            if allowed:
+                with self._access_lock:
+                    self._access_cache[key] = True
+            return allowed
         except DeadlineExceeded:
             logger.error(f"⏱️ Firestore timeout verifying case {case_id} for user {user_id}")
             return False
@@ -69,6 +106,11 @@ class WebSocketHandler:
             logger.error(f"❌ Error verifying case access: {e}")
             return False
 
+    def invalidate_case_access(self, case_id: str, user_id: str):
+        """Drop a cached access decision so the next check reads the case again"""
+        with self._access_lock:
+            self._access_cache.pop((case_id, user_id), None)
+
     def get_case_info(self, case_id: str) -> Dict[str, Any]:
         """Get case information for client"""
         try:
@@ -107,11 +149,22 @@ class WebSocketHandler:
 
     def get_chat_history(self, case_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Get chat history for a case"""
+        # The latest page is served from memory; older pages always go to Firestore
+        cacheable = self._cache_history and offset == 0 and 0 < limit <= self.HISTORY_CACHE_MESSAGES
+        if cacheable:
+            fill = object()
+            with self._history_lock:
+                cached = self._history_cache.get(case_id)
+                if cached is None:
+                    self._history_fills[case_id] = fill
+            if cached is not None:
+                return list(cached)[-limit:]
+        
         try:
             messages_query = self.firestore_client.collection('chat_messages')\
                 .where('caseId', '==', case_id)\
                 .order_by('timestamp', direction=firestore.Query.DESCENDING)\
-                .limit(limit)\
+                .limit(self.HISTORY_CACHE_MESSAGES if cacheable else limit)\
                 .offset(offset)
             
             messages = []
@@ -133,10 +186,44 @@ class WebSocketHandler:
             messages.reverse()
             
             # ✅ Convert timestamps to JSON-safe values
-            return to_json_serializable(messages)
+            messages = to_json_serializable(messages)
         except Exception as e:
             logger.error(f"❌ Error getting chat history: {e}")
+            if cacheable:
+                with self._history_lock:
+                    if self._history_fills.get(case_id) is fill:
+                        del self._history_fills[case_id]
             return []
+        
+        if cacheable:
+            with self._history_lock:
+                # Skipped if a message was saved while the query ran
+                if self._history_fills.get(case_id) is fill:
+                    del self._history_fills[case_id]
+                    self._history_cache[case_id] = deque(messages, maxlen=self.HISTORY_CACHE_MESSAGES)
+            return messages[-limit:]
+        return messages
+    
+    def _append_to_history(self, message_id: str, message_data: Dict[str, Any]):
+        """Add a just-saved message to the case's cached history, if it has one"""
+        case_id = message_data['caseId']
+        with self._history_lock:
+            self._history_fills.pop(case_id, None)
+            cached = self._history_cache.get(case_id)
+            if cached is None:
+                return
+            cached.append({
+                'id': message_id,
+                'caseId': case_id,
+                'userId': message_data['userId'],
+                'message': message_data['message'],
+                'type': message_data['type'],
+                'agent': message_data.get('agent'),
+                # Stands in for the server timestamp Firestore assigns
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'confidence': message_data.get('confidence'),
+                'metadata': to_json_serializable(message_data['metadata'])
+            })
 
     def save_message(self, case_id: str, user_id: str, message: str, message_type: str = 'user', 
                     metadata: Dict[str, Any] = None) -> str:
@@ -158,6 +245,7 @@ class WebSocketHandler:
             
             # Save to Firestore
             doc_ref = self.firestore_client.collection('chat_messages').add(message_data)
+            self._append_to_history(doc_ref[1].id, message_data)
             
             logger.info(f"💾 Saved {message_type} message for case {case_id}")
             return doc_ref[1].id
@@ -200,6 +288,9 @@ class WebSocketHandler:
             if batch_count > 0:
                 batch.commit()
             
+            with self._history_lock:
+                self._history_cache.pop(case_id, None)
+            
             logger.info(f"🗑️ Cleared {deleted_count} messages for case {case_id}")
             return deleted_count
             